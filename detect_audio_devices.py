@@ -8,6 +8,13 @@ import platform
 import sys
 import logging
 import argparse
+import functools
+import json
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,59 +22,244 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Common names of devices that capture system audio output
+SYS_AUDIO_KEYWORDS = [
+    "stereo mix", "wave out", "what u hear", "audio output", "virtual audio", 
+    "cable output", "voicemeeter", "audio render", "blackhole", "soundflower",
+    "loopback"
+]
+_SYS_AUDIO_RE = re.compile("|".join(map(re.escape, SYS_AUDIO_KEYWORDS)), re.IGNORECASE)
+
+# Quoted device name on dshow "Alternative name" lines
+_ALT_NAME_RE = re.compile(r'Alternative name\s+"([^"]+)"')
+
+# "[index] name" device lines in avfoundation -list_devices output
+_AVF_DEVICE_RE = re.compile(r"\]\s\[(\d+)\]\s(.+)$")
+
+# Accepted --platform values mapped to the platform names used below
+PLATFORM_ALIASES = {
+    "windows": "windows",
+    "win32": "windows",
+    "macos": "macos",
+    "darwin": "macos",
+    "linux": "linux",
+}
+
+# Resolve ffmpeg once; commands fall back to a PATH lookup if it wasn't found
+_FFMPEG_PATH = shutil.which("ffmpeg")
+_FFMPEG_CMD = _FFMPEG_PATH or "ffmpeg"
+
+CACHE_PATH = Path.home() / ".cache" / "google_meet_bot" / "audio_devices.json"
+CACHE_TTL = 30  # seconds
+
+def _load_cache():
+    """Load the on-disk device cache, returning an empty dict if unavailable."""
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache):
+    """Write the device cache to disk, ignoring failures."""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logger.debug(f"Could not write device cache: {e}")
+
+def invalidate_device_cache(key=None):
+    """Drop cached enumeration results for one platform key, or all of them."""
+    if key is None:
+        _save_cache({})
+        return
+    cache = _load_cache()
+    if cache.pop(key, None) is not None:
+        _save_cache(cache)
+
+def cached_enumeration(key, found_devices, ttl=CACHE_TTL):
+    """Cache the result of a device enumeration on disk for ``ttl`` seconds.
+    
+    The wrapped function gains a ``use_cache`` keyword; pass ``False`` to
+    force a fresh enumeration. Results must be JSON-serializable. Results
+    for which ``found_devices`` returns False (a failed probe or no devices)
+    are not cached, so a device plugged in afterwards shows up right away.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(use_cache=True):
+            if use_cache:
+                entry = _load_cache().get(key)
+                if entry and time.time() - entry.get("timestamp", 0) < ttl:
+                    return entry["payload"]
+            
+            payload = func()
+            if not found_devices(payload):
+                invalidate_device_cache(key)
+                return payload
+            
+            cache = _load_cache()
+            cache[key] = {"timestamp": time.time(), "payload": payload}
+            _save_cache(cache)
+            return payload
+        return wrapper
+    return decorator
+
 def check_ffmpeg_installed():
     """Check if FFmpeg is available on the system."""
-    try:
-        subprocess.run(
-            ["ffmpeg", "-version"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        return True
-    except FileNotFoundError:
+    if _FFMPEG_PATH is None:
         logger.error("FFmpeg not found. Please install FFmpeg and make sure it's in your PATH.")
         return False
+    return True
 
-def list_windows_audio_devices():
-    """List audio input devices available on Windows."""
-    print("\n=== Windows Audio Devices ===")
+def _run_probe(command):
+    """Run a device listing command and capture its result as plain data."""
+    # Skip the exec attempt entirely when the tool isn't installed
+    executable = shutil.which(command[0])
+    if executable is None:
+        return {"returncode": None, "stdout": "", "error": f"{command[0]} not installed"}
     
     try:
-        # List available DirectShow devices
-        command = ["ffmpeg", "-list_devices", "true", "-f", "dshow", "-i", "dummy"]
         result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+            [executable] + command[1:], 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.DEVNULL,
+            text=True, 
             check=False
         )
+        return {"returncode": result.returncode, "stdout": result.stdout, "error": None}
+    except Exception as e:
+        return {"returncode": None, "stdout": "", "error": str(e)}
+
+def _parse_pulse_sources(output):
+    """Split `pactl list sources` output into one key/value dict per source.
+    
+    Only the top-level fields of each source block are kept; keys are lowercased.
+    """
+    sources = []
+    current = None
+    for raw in output.splitlines():
+        if raw.startswith("Source #"):
+            current = {}
+            sources.append(current)
+            continue
         
-        # Check output for available audio devices
-        output = result.stderr
-        audio_devices = []
-        capture_audio = False
-        in_audio_section = False
+        # Skip lines outside a source block and nested property/port lines
+        if current is None or raw.startswith("\t\t"):
+            continue
         
-        for line in output.split('\n'):
-            # Print all device-related output for reference
+        sep = raw.find(":")
+        if sep < 0:
+            continue
+        key = raw[:sep].strip().lower()
+        if key and key not in current:
+            current[key] = raw[sep + 1:].strip()
+    
+    return sources
+
+@cached_enumeration("windows", lambda result: bool(result["audio_devices"]))
+def enumerate_windows_audio_devices():
+    """Enumerate DirectShow audio devices via FFmpeg."""
+    # List available DirectShow devices, parsing stderr as it streams in
+    command = [_FFMPEG_CMD, "-list_devices", "true", "-f", "dshow", "-i", "dummy"]
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1
+    )
+    
+    device_lines = []
+    audio_devices = []
+    capture_audio = False
+    in_audio_section = False
+    
+    try:
+        for line in iter(process.stderr.readline, ''):
+            line = line.rstrip('\n')
+            
+            # Keep all device-related output for reference
             if "DirectShow" in line or "Alternative name" in line:
-                print(line)
+                device_lines.append(line)
             
             if "DirectShow audio devices" in line:
                 capture_audio = True
                 in_audio_section = True
             elif "DirectShow video devices" in line:
                 capture_audio = False
+                # Audio devices already collected, no need to wait for the rest
+                if in_audio_section:
+                    process.terminate()
+                    break
             
-            if capture_audio and "Alternative name" in line:
-                try:
-                    device_name = line.split('"')[1]
-                    audio_devices.append(device_name)
-                except:
-                    pass
+            if capture_audio:
+                match = _ALT_NAME_RE.search(line)
+                if match:
+                    audio_devices.append(match.group(1))
+    finally:
+        process.stderr.close()
+        process.wait()
+    
+    return {
+        "device_lines": device_lines,
+        "audio_devices": audio_devices,
+        "in_audio_section": in_audio_section,
+    }
+
+@cached_enumeration("macos", lambda result: any(_parse_avfoundation_audio(result["output"])))
+def enumerate_macos_audio_devices():
+    """Enumerate AVFoundation devices via FFmpeg."""
+    # List available devices using FFmpeg's avfoundation
+    command = [_FFMPEG_CMD, "-f", "avfoundation", "-list_devices", "true", "-i", ""]
+    result = subprocess.run(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False
+    )
+    
+    # Output from FFmpeg will be in stderr
+    return {"output": result.stderr}
+
+@cached_enumeration("linux", lambda result: bool(
+    result["pulse"]["monitors"] or (result["alsa"]["returncode"] == 0 and result["alsa"]["stdout"].strip())
+))
+def enumerate_linux_audio_devices():
+    """Enumerate PulseAudio sources and ALSA devices."""
+    # Query PulseAudio and ALSA concurrently; both just wait on external tools
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pulse_future = executor.submit(_run_probe, ["pactl", "list", "sources"])
+        alsa_future = executor.submit(_run_probe, ["arecord", "-L"])
+        pulse = pulse_future.result()
+        alsa = alsa_future.result()
+    
+    # Find monitor sources which are good for system audio
+    monitors = []
+    if pulse["returncode"] == 0:
+        for source in _parse_pulse_sources(pulse["stdout"]):
+            name = source.get("name", "")
+            if name.endswith(".monitor"):
+                monitors.append(name)
+    pulse["monitors"] = monitors
+    
+    return {"pulse": pulse, "alsa": alsa}
+
+def list_windows_audio_devices(use_cache=True):
+    """List audio input devices available on Windows."""
+    print("\n=== Windows Audio Devices ===")
+    
+    try:
+        devices = enumerate_windows_audio_devices(use_cache=use_cache)
+        
+        # Print all device-related output for reference
+        for line in devices["device_lines"]:
+            print(line)
         
+        audio_devices = devices["audio_devices"]
         if audio_devices:
             print("\nDetected audio devices:")
             for i, device in enumerate(audio_devices):
@@ -77,10 +269,7 @@ def list_windows_audio_devices():
             found_recommended = False
             for device in audio_devices:
                 # Check for common system audio capture device names
-                if any(name.lower() in device.lower() for name in [
-                    "stereo mix", "wave out", "what u hear", "audio output", "virtual audio", 
-                    "cable output", "voicemeeter", "audio render"
-                ]):
+                if _SYS_AUDIO_RE.search(device):
                     print(f"  * {device} - Use with: audio=\"{device}\"")
                     found_recommended = True
             
@@ -89,30 +278,19 @@ def list_windows_audio_devices():
                 print("  * You may need to enable 'Stereo Mix' in your sound settings")
                 print("  * Or install virtual audio cable software")
         
-        if not in_audio_section:
+        if not devices["in_audio_section"]:
             print("No audio devices section found in FFmpeg output.")
     
     except Exception as e:
         print(f"Error detecting audio devices: {e}")
 
-def list_macos_audio_devices():
+def list_macos_audio_devices(use_cache=True):
     """List audio input devices available on macOS."""
     print("\n=== macOS Audio Devices ===")
     
     try:
-        # List available devices using FFmpeg's avfoundation
-        command = ["ffmpeg", "-f", "avfoundation", "-list_devices", "true", "-i", ""]
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False
-        )
-        
-        # Output from FFmpeg will be in stderr
-        output = result.stderr
-        print(output)
+        devices = enumerate_macos_audio_devices(use_cache=use_cache)
+        print(devices["output"])
         
         print("\nUsage for recording with FFmpeg:")
         print("  - For screen: -f avfoundation -i 1 ...")
@@ -124,81 +302,144 @@ def list_macos_audio_devices():
     except Exception as e:
         print(f"Error detecting macOS audio devices: {e}")
 
-def list_linux_audio_devices():
+def list_linux_audio_devices(use_cache=True):
     """List audio input devices available on Linux."""
     print("\n=== Linux Audio Devices ===")
     
+    devices = enumerate_linux_audio_devices(use_cache=use_cache)
+    
     # Try PulseAudio
-    try:
-        print("Checking PulseAudio sources...")
-        command = ["pactl", "list", "sources"]
-        result = subprocess.run(
-            command, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True, 
-            check=False
-        )
+    print("Checking PulseAudio sources...")
+    pulse = devices["pulse"]
+    if pulse["error"]:
+        print(f"Error checking PulseAudio: {pulse['error']}")
+    elif pulse["returncode"] == 0:
+        print(pulse["stdout"])
         
-        if result.returncode == 0:
-            print(result.stdout)
-            
-            # Find monitor sources which are good for system audio
-            print("\nPotential system audio capture devices:")
-            for line in result.stdout.split('\n'):
-                if "monitor" in line.lower() and "name:" in line.lower():
-                    device = line.split("name:")[1].strip()
-                    print(f"  * {device} - Use with FFmpeg: -f pulse -i {device}")
-        else:
-            print("PulseAudio not available or error listing sources")
-    
-    except Exception as e:
-        print(f"Error checking PulseAudio: {e}")
+        # Monitor sources are good for system audio
+        print("\nPotential system audio capture devices:")
+        for device in pulse["monitors"]:
+            print(f"  * {device} - Use with FFmpeg: -f pulse -i {device}")
+    else:
+        print("PulseAudio not available or error listing sources")
     
     # Try ALSA devices
-    try:
-        print("\nChecking ALSA devices...")
-        command = ["arecord", "-L"]
-        result = subprocess.run(
-            command, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True, 
-            check=False
-        )
+    print("\nChecking ALSA devices...")
+    alsa = devices["alsa"]
+    if alsa["error"]:
+        print(f"Error checking ALSA devices: {alsa['error']}")
+    elif alsa["returncode"] == 0:
+        print(alsa["stdout"])
+        print("\nUsage for recording with FFmpeg:")
+        print("  * Use -f alsa -i <device> when using ALSA devices")
+    else:
+        print("ALSA tools not available or error listing devices")
+
+def _parse_avfoundation_audio(output):
+    """Yield (index, name) pairs from the audio section of avfoundation output."""
+    in_audio_section = False
+    for line in output.splitlines():
+        if "AVFoundation audio devices" in line:
+            in_audio_section = True
+        elif "AVFoundation video devices" in line:
+            in_audio_section = False
+        elif in_audio_section:
+            match = _AVF_DEVICE_RE.search(line)
+            if match:
+                yield int(match.group(1)), match.group(2).strip()
+
+def collect_audio_devices(target_platform, use_cache=True):
+    """Return detected audio devices as structured, JSON-serializable data.
+    
+    Args:
+        target_platform: One of "windows", "macos" or "linux"
+        use_cache: Whether cached enumeration results may be used
+    
+    Returns:
+        Dict with the platform and a list of devices, each having a name,
+        kind (capture API) and whether it is recommended for system audio.
+    """
+    devices = []
+    
+    if target_platform == "windows":
+        for name in enumerate_windows_audio_devices(use_cache=use_cache)["audio_devices"]:
+            devices.append({
+                "name": name,
+                "kind": "dshow",
+                "recommended": bool(_SYS_AUDIO_RE.search(name)),
+            })
+    
+    elif target_platform == "macos":
+        output = enumerate_macos_audio_devices(use_cache=use_cache)["output"]
+        for index, name in _parse_avfoundation_audio(output):
+            devices.append({
+                "name": name,
+                "kind": "avfoundation",
+                "index": index,
+                "recommended": bool(_SYS_AUDIO_RE.search(name)),
+            })
+    
+    elif target_platform == "linux":
+        result = enumerate_linux_audio_devices(use_cache=use_cache)
+        
+        pulse = result["pulse"]
+        if pulse["returncode"] == 0:
+            for source in _parse_pulse_sources(pulse["stdout"]):
+                name = source.get("name")
+                if name:
+                    devices.append({
+                        "name": name,
+                        "kind": "pulse",
+                        "recommended": name.endswith(".monitor"),
+                    })
         
-        if result.returncode == 0:
-            print(result.stdout)
-            print("\nUsage for recording with FFmpeg:")
-            print("  * Use -f alsa -i <device> when using ALSA devices")
-        else:
-            print("ALSA tools not available or error listing devices")
+        alsa = result["alsa"]
+        if alsa["returncode"] == 0:
+            # Device names are the unindented lines; descriptions are indented below them
+            for line in alsa["stdout"].splitlines():
+                if line and not line[0].isspace():
+                    devices.append({
+                        "name": line.strip(),
+                        "kind": "alsa",
+                        "recommended": False,
+                    })
     
-    except Exception:
-        print("Error checking ALSA devices")
+    else:
+        raise ValueError(f"Unsupported platform: {target_platform}")
+    
+    return {"platform": target_platform, "devices": devices}
 
 def main():
     parser = argparse.ArgumentParser(description="Detect available audio devices for recording")
     parser.add_argument("--platform", help="Force detection for specific platform (windows, macos, linux)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and re-detect devices")
+    parser.add_argument("--json", action="store_true", help="Print detected devices as JSON")
     
     args = parser.parse_args()
     
     if not check_ffmpeg_installed():
         return 1
     
-    print("Detecting audio devices for FFmpeg recording...")
+    requested_platform = args.platform.lower() if args.platform else platform.system().lower()
+    target_platform = PLATFORM_ALIASES.get(requested_platform)
+    if target_platform is None:
+        print(f"Unsupported platform: {requested_platform}")
+        return 1
+    
+    use_cache = not args.refresh
     
-    target_platform = args.platform.lower() if args.platform else platform.system().lower()
+    if args.json:
+        print(json.dumps(collect_audio_devices(target_platform, use_cache), indent=2))
+        return 0
     
-    if target_platform in ["windows", "win32"]:
-        list_windows_audio_devices()
-    elif target_platform in ["macos", "darwin"]:
-        list_macos_audio_devices()
-    elif target_platform in ["linux"]:
-        list_linux_audio_devices()
+    print("Detecting audio devices for FFmpeg recording...")
+    
+    if target_platform == "windows":
+        list_windows_audio_devices(use_cache)
+    elif target_platform == "macos":
+        list_macos_audio_devices(use_cache)
     else:
-        print(f"Unsupported platform: {target_platform}")
-        return 1
+        list_linux_audio_devices(use_cache)
     
     print("\nTIP: If you need to capture system audio:")
     print("- Windows: Enable 'Stereo Mix' in sound settings or use software like VB-Cable")
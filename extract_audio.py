@@ -9,7 +9,11 @@ import sys
 import subprocess
 import argparse
 import glob
-import platform
+import json
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 import logging
 
@@ -20,6 +24,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# PyAV is optional - without it we fall back to running the ffmpeg CLI
+try:
+    import av
+except ImportError:
+    av = None
+
+# Use CREATE_NO_WINDOW on Windows to avoid command window popup
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if sys.platform == "win32" else 0
+
+# libavcodec's quality-to-lambda scale factor, used to map -q:a values
+FF_QP2LAMBDA = 118
+
+# Maximum number of decoded frames buffered between decoder and encoder
+FRAME_QUEUE_SIZE = 32
+
+# Containers whose audio is often MP3. Without PyAV, probing costs an extra
+# ffprobe run, so other files (e.g. MP4 recordings with AAC) go straight to encoding.
+MP3_CONTAINER_SUFFIXES = (".mp3", ".avi", ".mkv", ".flv")
+
 def find_latest_recording(directory="./recordings"):
     """Find the latest MP4 recording file."""
     path = Path(directory)
@@ -27,97 +50,342 @@ def find_latest_recording(directory="./recordings"):
         logger.error(f"Directory not found: {directory}")
         return None
         
-    mp4_files = list(path.glob("*.mp4"))
-    if not mp4_files:
+    # Get the most recently modified file, using the stat info cached by scandir
+    with os.scandir(path) as entries:
+        latest_entry = max(
+            (e for e in entries if e.name.endswith(".mp4") and e.is_file()),
+            key=lambda e: e.stat().st_mtime,
+            default=None
+        )
+    
+    if latest_entry is None:
         logger.warning(f"No MP4 files found in {directory}")
         return None
         
-    # Get the most recently modified file
-    latest_file = max(mp4_files, key=lambda p: p.stat().st_mtime)
-    return latest_file
+    return Path(latest_entry.path)
 
-def extract_audio(video_file, output_file=None, quality=4):
-    """Extract audio from video to MP3 format."""
-    if not video_file.exists():
-        logger.error(f"Video file not found: {video_file}")
-        return False
+def _file_size(path):
+    """Return the size of a file in bytes, or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+def _put_frame(frames, item, stop):
+    """Put an item on the frame queue, giving up if the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _decode_frames(in_container, in_stream, frames, stop, errors):
+    """Decode audio frames onto a queue, ending with a ``None`` sentinel."""
+    try:
+        for frame in in_container.decode(in_stream):
+            frame.pts = None
+            if not _put_frame(frames, frame, stop):
+                return
+    except Exception as e:
+        errors.append(e)
+    _put_frame(frames, None, stop)
+
+def _encode_mp3(video_file, output_file, quality=None, bit_rate=None, sample_rate=None, layout=None):
+    """Decode the first audio stream of ``video_file`` and encode it to MP3 in-process."""
+    with av.open(str(video_file)) as in_container:
+        if not in_container.streams.audio:
+            raise ValueError(f"No audio stream found in {video_file}")
+        in_stream = in_container.streams.audio[0]
         
-    # If output file not specified, use same name but with .mp3 extension
-    if not output_file:
-        output_file = video_file.with_suffix(".mp3")
+        with av.open(str(output_file), "w", format="mp3") as out_container:
+            out_stream = out_container.add_stream("libmp3lame", rate=sample_rate or in_stream.rate)
+            if layout:
+                out_stream.layout = layout
+            if bit_rate:
+                out_stream.bit_rate = bit_rate
+            if quality is not None:
+                # Equivalent of ffmpeg's -q:a (VBR quality, 0-9)
+                out_stream.codec_context.options = {
+                    "flags": "+qscale",
+                    "global_quality": str(quality * FF_QP2LAMBDA)
+                }
+            
+            # Decode on a background thread so decoding and encoding overlap
+            frames = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+            stop = threading.Event()
+            errors = []
+            decoder = threading.Thread(
+                target=_decode_frames,
+                args=(in_container, in_stream, frames, stop, errors),
+                daemon=True
+            )
+            decoder.start()
+            
+            try:
+                while True:
+                    frame = frames.get()
+                    if frame is None:
+                        break
+                    for packet in out_stream.encode(frame):
+                        out_container.mux(packet)
+            finally:
+                stop.set()
+                decoder.join()
+            
+            if errors:
+                raise errors[0]
+            
+            # Flush the encoder
+            for packet in out_stream.encode(None):
+                out_container.mux(packet)
+
+def _extract_audio_pyav(video_file, output_file, quality):
+    """Extract audio with PyAV, switching encoder settings on failure."""
+    try:
+        _encode_mp3(video_file, output_file, quality=quality, sample_rate=44100, layout="stereo")
+        file_size = output_file.stat().st_size
+        logger.info(f"Audio extraction successful! Output size: {file_size / 1024:.2f} KB")
+        return True
+    except av.error.FFmpegError as e:
+        logger.warning(f"First extraction attempt failed: {e}")
+        logger.info("Trying alternative extraction method...")
     
-    logger.info(f"Extracting audio from: {video_file}")
-    logger.info(f"Output file: {output_file}")
+    try:
+        _encode_mp3(video_file, output_file, bit_rate=192000, sample_rate=44100, layout="stereo")
+        file_size = output_file.stat().st_size
+        logger.info(f"Audio extraction successful with alternative method! Output size: {file_size / 1024:.2f} KB")
+        return True
+    except av.error.FFmpegError as e:
+        logger.error(f"All extraction attempts failed: {e}")
+        return False
+
+def _extract_audio_ffmpeg(video_file, output_file, quality):
+    """Extract audio by running the ffmpeg CLI, retrying with a more compatible command."""
+    # Convert the paths once for both commands
+    video_path = os.fspath(video_file)
+    output_path = os.fspath(output_file)
     
     # Try first extraction method
     command = [
         "ffmpeg",
-        "-i", str(video_file),
+        "-hide_banner",
+        "-loglevel", "error",  # Only report actual errors
+        "-i", video_path,
         "-vn",  # No video
         "-acodec", "libmp3lame",
         "-q:a", str(quality),  # Quality setting (0-9, lower is better)
+        "-ar", "44100",  # Normalize the format up front so one run usually suffices
+        "-ac", "2",
         "-y",  # Overwrite output file
-        str(output_file)
+        output_path
     ]
     
     logger.info(f"Running command: {' '.join(command)}")
     
+    process = subprocess.run(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+        creationflags=_CREATION_FLAGS
+    )
+    
+    if process.returncode == 0:
+        file_size = _file_size(output_file)
+        if file_size is not None:
+            logger.info(f"Audio extraction successful! Output size: {file_size / 1024:.2f} KB")
+            return True
+    
+    # If first method failed, try alternative method
+    logger.warning(f"First extraction attempt failed: {process.stderr}")
+    logger.info("Trying alternative extraction method...")
+    
+    alt_command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-i", video_path,
+        "-vn",  # No video
+        "-ar", "44100",  # Audio sample rate
+        "-ac", "2",  # Stereo
+        "-b:a", "192k",  # Audio bitrate
+        "-y",  # Overwrite output file
+        output_path
+    ]
+    
+    logger.info(f"Running command: {' '.join(alt_command)}")
+    
+    alt_process = subprocess.run(
+        alt_command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+        creationflags=_CREATION_FLAGS
+    )
+    
+    file_size = _file_size(output_file) if alt_process.returncode == 0 else None
+    if file_size is not None:
+        logger.info(f"Audio extraction successful with alternative method! Output size: {file_size / 1024:.2f} KB")
+        return True
+    else:
+        logger.error(f"All extraction attempts failed: {alt_process.stderr}")
+        return False
+
+def _probe_audio_codec(video_file):
+    """Return the codec name of the first audio stream, or None if unknown."""
+    path = os.fspath(video_file)
     try:
-        # Use CREATE_NO_WINDOW on Windows to avoid command window popup
-        creation_flags = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-        process = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False,
-            creationflags=creation_flags
-        )
-        
-        if process.returncode == 0:
-            if output_file.exists():
-                file_size = output_file.stat().st_size
-                logger.info(f"Audio extraction successful! Output size: {file_size / 1024:.2f} KB")
-                return True
-        
-        # If first method failed, try alternative method
-        logger.warning(f"First extraction attempt failed: {process.stderr}")
-        logger.info("Trying alternative extraction method...")
+        if av is not None:
+            with av.open(path) as container:
+                if not container.streams.audio:
+                    return None
+                # Decoder names vary (e.g. "mp3float"); the canonical name matches ffprobe
+                codec = container.streams.audio[0].codec_context.codec
+                return getattr(codec, "canonical_name", codec.name)
         
-        alt_command = [
-            "ffmpeg",
-            "-i", str(video_file),
-            "-vn",  # No video
-            "-ar", "44100",  # Audio sample rate
-            "-ac", "2",  # Stereo
-            "-b:a", "192k",  # Audio bitrate
-            "-y",  # Overwrite output file
-            str(output_file)
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "a:0",
+            "-show_entries", "stream=codec_name",
+            "-print_format", "json",
+            path
         ]
-        
-        logger.info(f"Running command: {' '.join(alt_command)}")
-        
-        alt_process = subprocess.run(
-            alt_command,
+        result = subprocess.run(
+            command,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            check=False,
-            creationflags=creation_flags
+            check=False
         )
+        if result.returncode != 0:
+            return None
+        streams = json.loads(result.stdout).get("streams", [])
+        return streams[0].get("codec_name") if streams else None
+    except Exception as e:
+        logger.debug(f"Could not probe audio codec: {e}")
+        return None
+
+def _copy_audio_stream(video_file, output_file):
+    """Copy an MP3 audio stream into the output file without re-encoding."""
+    logger.info("Source audio is already MP3, copying the stream without re-encoding")
+    try:
+        if av is not None:
+            with av.open(str(video_file)) as in_container, \
+                    av.open(str(output_file), "w", format="mp3") as out_container:
+                in_stream = in_container.streams.audio[0]
+                if hasattr(out_container, "add_stream_from_template"):
+                    out_stream = out_container.add_stream_from_template(in_stream)
+                else:
+                    out_stream = out_container.add_stream(template=in_stream)
+                
+                for packet in in_container.demux(in_stream):
+                    # Skip the empty flush packet emitted at end of stream
+                    if packet.dts is None:
+                        continue
+                    packet.stream = out_stream
+                    out_container.mux(packet)
+        else:
+            command = [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel", "error",
+                "-i", os.fspath(video_file),
+                "-vn",  # No video
+                "-c:a", "copy",
+                "-y",  # Overwrite output file
+                os.fspath(output_file)
+            ]
+            process = subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=False,
+                creationflags=_CREATION_FLAGS
+            )
+            if process.returncode != 0:
+                logger.warning(f"Stream copy failed: {process.stderr}")
+                return False
+    except Exception as e:
+        logger.warning(f"Stream copy failed: {e}")
+        return False
+    
+    file_size = _file_size(output_file)
+    if file_size is None:
+        return False
+    logger.info(f"Audio extraction successful! Output size: {file_size / 1024:.2f} KB")
+    return True
+
+def extract_audio(video_file, output_file=None, quality=4):
+    """Extract audio from video to MP3 format."""
+    if not video_file.exists():
+        logger.error(f"Video file not found: {video_file}")
+        return False
         
-        if alt_process.returncode == 0 and output_file.exists():
-            file_size = output_file.stat().st_size
-            logger.info(f"Audio extraction successful with alternative method! Output size: {file_size / 1024:.2f} KB")
+    # If output file not specified, use same name but with .mp3 extension
+    if not output_file:
+        output_file = video_file.with_suffix(".mp3")
+    
+    logger.info(f"Extracting audio from: {video_file}")
+    logger.info(f"Output file: {output_file}")
+    
+    try:
+        # Skip decoding and encoding entirely when the source audio is already MP3.
+        # PyAV probes in-process; the ffprobe fallback is only worth a process
+        # for containers that usually carry MP3.
+        might_be_mp3 = av is not None or video_file.suffix.lower() in MP3_CONTAINER_SUFFIXES
+        if might_be_mp3 and _probe_audio_codec(video_file) == "mp3" \
+                and _copy_audio_stream(video_file, output_file):
             return True
-        else:
-            logger.error(f"All extraction attempts failed: {alt_process.stderr}")
-            return False
+        
+        # Encode in-process when PyAV is available, avoiding ffmpeg process launches
+        if av is not None:
+            return _extract_audio_pyav(video_file, output_file, quality)
+        return _extract_audio_ffmpeg(video_file, output_file, quality)
     
     except Exception as e:
         logger.error(f"Error during audio extraction: {str(e)}")
         return False
 
+def batch_extract(directory="./recordings", quality=4, max_workers=None):
+    """Extract audio from every MP4 recording in a directory concurrently."""
+    path = Path(directory)
+    if not path.exists():
+        logger.error(f"Directory not found: {directory}")
+        return False
+    
+    with os.scandir(path) as entries:
+        video_files = [Path(e.path) for e in entries if e.name.endswith(".mp4") and e.is_file()]
+    
+    if not video_files:
+        logger.warning(f"No MP4 files found in {directory}")
+        return False
+    
+    # Each extraction is already multi-threaded, so use half the cores by default
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 2) // 2)
+    
+    logger.info(f"Extracting audio from {len(video_files)} recordings using {max_workers} workers")
+    
+    # With PyAV, long-lived worker processes keep libav loaded across files.
+    # Otherwise each file spawns ffmpeg anyway, so threads suffice.
+    if av is not None:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    with executor:
+        results = list(executor.map(partial(extract_audio, quality=quality), video_files))
+    
+    succeeded = sum(1 for result in results if result)
+    logger.info(f"Extracted audio from {succeeded} of {len(video_files)} recordings")
+    return succeeded == len(video_files)
+
 def main():
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(description="Extract audio from video recordings")
@@ -126,9 +394,15 @@ def main():
     parser.add_argument("-d", "--dir", default="./recordings", help="Directory to search for recordings")
     parser.add_argument("-q", "--quality", type=int, default=4, help="MP3 quality (0-9, lower is better)")
     parser.add_argument("-l", "--latest", action="store_true", help="Extract from the latest recording")
+    parser.add_argument("-b", "--batch", action="store_true", help="Extract from all recordings in --dir")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of parallel extractions in batch mode")
     
     args = parser.parse_args()
     
+    if args.batch:
+        success = batch_extract(args.dir, args.quality, args.jobs)
+        return 0 if success else 1
+    
     if args.latest:
         video_file = find_latest_recording(args.dir)
         if not video_file:
@@ -138,7 +412,7 @@ def main():
         video_file = Path(args.input)
     else:
         parser.print_help()
-        logger.error("Please specify either --input or --latest")
+        logger.error("Please specify --input, --latest or --batch")
         return 1
     
     output_file = Path(args.output) if args.output else None
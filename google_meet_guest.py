@@ -7,12 +7,15 @@ Google Meet sessions as a guest, incorporating all the fixes for reliable operat
 import logging
 import time
 import os
-import argparse
+import asyncio
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 import re
+import json
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -25,13 +28,14 @@ logger = logging.getLogger(__name__)
 # Try to import selenium - provide helpful error if not found
 try:
     from selenium import webdriver
-    from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+    from selenium.common.exceptions import (
+        TimeoutException, NoSuchElementException, StaleElementReferenceException,
+        WebDriverException, InvalidSessionIdException
+    )
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.common.action_chains import ActionChains
     
     try:
         from webdriver_manager.chrome import ChromeDriverManager
@@ -57,11 +61,109 @@ except ImportError:
         MeetingRecorder = None
 
 
+# Patterns like https://meet.google.com/abc-def-ghi or simply abc-def-ghi
+_MEET_ID_RE = re.compile(r'(?:https?://)?(?:meet\.google\.com/)?([a-z0-9\-]+)(?:\?.*)?')
+# A bare meeting code without the meet.google.com prefix
+_BARE_ID_RE = re.compile(r'^[a-z0-9-]+$')
+
+# Mutes the microphone/camera, fills the name field and clicks the join button
+# as soon as each appears, driven by a MutationObserver. The display name is
+# read from window.__botName. Progress is published in window.__joinState:
+# "waiting-for-name" -> "waiting-for-join" -> "join-clicked".
+#
+# Written as a self-contained expression so it can be both pre-injected with
+# Page.addScriptToEvaluateOnNewDocument and run with execute_script.
+JOIN_STATE_MACHINE_JS = """(function () {
+    if (window.top !== window || location.hostname !== 'meet.google.com') {
+        return null;
+    }
+    if (window.__joinObserver) {
+        return window.__joinState;
+    }
+    
+    const isVisible = el => el.offsetParent !== null || el.getClientRects().length > 0;
+    const findNameInput = () => Array.from(document.querySelectorAll('input')).find(i => isVisible(i) && (
+        i.getAttribute('aria-label') === 'Your name' || i.placeholder === 'Your name' || i.id === 'c11' ||
+        /name/i.test(i.placeholder || '') || /name/i.test(i.getAttribute('aria-label') || '')
+    ));
+    const findJoinButton = () => Array.from(document.querySelectorAll('button')).find(b => isVisible(b) && !b.disabled && (
+        b.getAttribute('jsname') === 'Qx7uuf' || /ask to join|join now/i.test(b.innerText || '')
+    ));
+    const muteDevices = () => {
+        document.querySelectorAll(
+            '[data-tooltip="Turn off microphone (ctrl + d)"], [aria-label="Turn off microphone"], ' +
+            '[data-tooltip="Turn off camera (ctrl + e)"], [aria-label="Turn off camera"]'
+        ).forEach(toggle => {
+            if (isVisible(toggle) && toggle.getAttribute('data-is-muted') !== 'true') {
+                toggle.click();
+            }
+        });
+    };
+    
+    const step = () => {
+        if (window.__joinState === 'waiting-for-name') {
+            const input = findNameInput();
+            if (input) {
+                input.focus();
+                input.value = window.__botName || '';
+                input.dispatchEvent(new Event('input', { bubbles: true }));
+                input.dispatchEvent(new Event('change', { bubbles: true }));
+                window.__joinState = 'waiting-for-join';
+            }
+        }
+        if (window.__joinState === 'waiting-for-join') {
+            const button = findJoinButton();
+            if (button) {
+                // Never join with a live microphone or camera
+                muteDevices();
+                button.click();
+                window.__joinState = 'join-clicked';
+            }
+        }
+        if (window.__joinState !== 'waiting-for-name' && window.__joinState !== 'waiting-for-join') {
+            window.__joinObserver.disconnect();
+        }
+    };
+    
+    window.__joinState = 'waiting-for-name';
+    window.__joinObserver = new MutationObserver(step);
+    window.__joinObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['disabled']
+    });
+    step();
+    return window.__joinState;
+})()
+"""
+
+# Screenshots waiting to be written before new requests are dropped
+MAX_PENDING_SCREENSHOTS = 8
+
+# Seconds a meeting state probe result stays fresh; the stay loop and the
+# monitor thread poll on their own schedules and can share one probe
+MEETING_STATE_TTL = 2.0
+
+# Returns [currentUrl, meetingEnded] for the current page. Only headings and
+# live regions are read while the in-call leave button is present; the whole
+# body text is scanned only once the call controls are gone.
+MEETING_STATE_JS = """
+    const endRe = /meeting ended|you left the meeting|call has ended/i;
+    const banners = document.querySelectorAll('h1, h2, [role="heading"], [role="alert"], [aria-live]');
+    for (const el of banners) {
+        if (endRe.test(el.textContent || '')) {
+            return [location.href, true];
+        }
+    }
+    const inCall = document.querySelector('button[jsname="CQylAd"], button[aria-label*="leave call" i]');
+    if (inCall || !document.body) {
+        return [location.href, false];
+    }
+    return [location.href, endRe.test(document.body.innerText)];
+"""
+
+
 def extract_meeting_id(url):
     """Extract meeting ID from Google Meet URL."""
-    # Looking for patterns like https://meet.google.com/abc-def-ghi or simply abc-def-ghi
-    pattern = r'(?:https?://)?(?:meet\.google\.com/)?([a-z0-9\-]+)(?:\?.*)?'
-    match = re.search(pattern, url)
+    match = _MEET_ID_RE.match(url)
     if match:
         return match.group(1)
     return "unknown"
@@ -69,13 +171,23 @@ def extract_meeting_id(url):
 class GoogleMeetGuestBot:
     """Simple bot for joining Google Meet as a guest with recording capabilities."""
     
-    def __init__(self, display_name="Guest", debug=False, record_meeting=False, recording_output_dir="./recordings"):
+    # ChromeDriver path resolved by webdriver-manager, shared across instances
+    _cached_driver_path: Optional[str] = None
+    
+    def __init__(self, display_name="Guest", debug=False, record_meeting=False, recording_output_dir="./recordings",
+                 profile_dir=None):
         """Initialize the bot with display name and debug mode."""
         self.display_name = display_name
         self.debug = debug
+        self.profile_dir = profile_dir  # Persistent Chrome profile, or None for a fresh one
         self.driver = None
         self.wait = None
         self.wait_timeout = 30  # seconds
+        self._screenshot_pool = None  # Created on first screenshot
+        self._pending_screenshots = set()  # Filenames queued but not yet written
+        self._screenshot_lock = threading.Lock()
+        self._loop = None  # Event loop running the periodic checks, started on demand
+        self._meeting_state_cache = None  # (timestamp, (url, ended)) of the last probe
         
         # Recording settings
         self.record_meeting = record_meeting
@@ -87,6 +199,8 @@ class GoogleMeetGuestBot:
                     output_dir=recording_output_dir,
                     prefix=f"meet_"
                 )
+                # Probe the capture devices while the browser starts and joins
+                self.recorder.warm_up()
                 logger.info(f"Recording will be saved to: {recording_output_dir}")
             except Exception as e:
                 logger.error(f"Failed to initialize meeting recorder: {e}")
@@ -104,6 +218,12 @@ class GoogleMeetGuestBot:
                 logger.info("Running in headless mode")
                 options.add_argument("--headless=new")
                 options.add_argument("--disable-gpu")
+                
+                # Nobody sees the page in headless mode, so skip downloading images
+                options.add_argument("--blink-settings=imagesEnabled=false")
+                options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2
+                })
             else:
                 logger.info("Running in debug mode with visible browser")
                 options.add_argument("--start-maximized")
@@ -115,6 +235,27 @@ class GoogleMeetGuestBot:
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
             
+            # Reuse a persistent profile so Meet's scripts come from the HTTP cache
+            if self.profile_dir:
+                profile_path = os.path.abspath(self.profile_dir)
+                logger.info(f"Using persistent Chrome profile: {profile_path}")
+                options.add_argument(f"--user-data-dir={profile_path}")
+                options.add_argument("--profile-directory=Default")
+            
+            # Turn off background features the bot never uses so Chrome starts
+            # fewer helper processes and makes no extra network fetches
+            options.add_argument("--disable-features=Translate,OptimizationHints,MediaRouter,"
+                                 "InterestFeedContentSuggestions,CalculateNativeWinOcclusion,"
+                                 "OptimizationHintsFetching")
+            for flag in ("--disable-background-networking", "--disable-sync",
+                         "--disable-default-apps", "--disable-extensions",
+                         "--disable-component-update", "--no-first-run",
+                         "--no-default-browser-check", "--disable-client-side-phishing-detection",
+                         "--disable-hang-monitor", "--disable-popup-blocking",
+                         "--disable-prompt-on-repost", "--disable-renderer-backgrounding",
+                         "--metrics-recording-only"):
+                options.add_argument(flag)
+            
             # Set a recent user agent to avoid detection
             options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36")
             
@@ -123,31 +264,49 @@ class GoogleMeetGuestBot:
             options.add_experimental_option("useAutomationExtension", False)
             
             # Try to initialize Chrome with multiple fallback strategies
+            driver_path = GoogleMeetGuestBot._cached_driver_path
             try:
-                # Method 1: Try direct initialization
-                logger.info("Attempting to initialize Chrome directly")
-                self.driver = webdriver.Chrome(options=options)
+                if driver_path:
+                    # Reuse the ChromeDriver resolved by an earlier bot instance
+                    logger.info(f"Initializing Chrome with cached ChromeDriver: {driver_path}")
+                    self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+                else:
+                    # Method 1: Try direct initialization
+                    logger.info("Attempting to initialize Chrome directly")
+                    self.driver = webdriver.Chrome(options=options)
             except Exception as e1:
-                logger.warning(f"Direct Chrome initialization failed: {str(e1)}")
+                if driver_path:
+                    logger.warning(f"Chrome initialization with cached ChromeDriver failed: {str(e1)}")
+                else:
+                    logger.warning(f"Direct Chrome initialization failed: {str(e1)}")
                 
-                # Method 2: Try using webdriver-manager
+                # Method 2: Try using webdriver-manager and remember the resolved
+                # driver so later bot instances skip the lookup
                 try:
                     logger.info("Trying with webdriver-manager")
-                    service = Service(ChromeDriverManager().install())
+                    GoogleMeetGuestBot._cached_driver_path = ChromeDriverManager().install()
+                    service = Service(GoogleMeetGuestBot._cached_driver_path)
                     self.driver = webdriver.Chrome(service=service, options=options)
                 except Exception as e2:
                     logger.error(f"Failed to initialize Chrome: {str(e2)}")
                     return False
             
-            # Apply anti-detection measures
+            # Apply anti-detection measures and install the join state machine
+            # before any of Meet's own scripts run
             self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
                 "source": """
                     Object.defineProperty(navigator, 'webdriver', {
                         get: () => undefined
                     });
-                """
+                """ + f"window.__botName = {json.dumps(self.display_name)};" + JOIN_STATE_MACHINE_JS
             })
             
+            # The bot never downloads anything, so refuse downloads outright
+            try:
+                self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "deny"})
+            except Exception as e:
+                logger.debug(f"Could not set download behavior: {str(e)}")
+            
             # Set up wait timeout
             self.wait = WebDriverWait(self.driver, self.wait_timeout)
             logger.info("Chrome browser initialized successfully")
@@ -175,43 +334,44 @@ class GoogleMeetGuestBot:
             
             # Fix URL format if needed
             if "meet.google.com" not in meet_url:
-                if re.match(r'^[a-z0-9-]+$', meet_url):
+                if _BARE_ID_RE.match(meet_url):
                     meet_url = f"https://meet.google.com/{meet_url}"
                     logger.info(f"Updated URL to: {meet_url}")
             
             # Navigate to the meeting
             logger.info(f"Navigating to meeting: {meet_url}")
             self.driver.get(meet_url)
-            time.sleep(3)  # Wait for page to load
             
             # Save screenshot of initial page
             self._save_screenshot("01-initial-page.png")
             
-            # Step 1: Fill in the name field
-            logger.info("Looking for the name input field")
-            name_filled = self._fill_name_field()
-            
-            if not name_filled:
-                logger.error("Could not fill in name field")
-                self._save_screenshot("error-name-field.png")
-                return False
-            
-            # Step 2: Turn off microphone and camera before joining
-            logger.info("Turning off microphone and camera")
-            self._turn_off_mic_and_camera()
-            self._save_screenshot("01d-after-mic-camera-toggle.png")
-            
-            # Step 3: Click the "Ask to join" button
-            logger.info("Looking for 'Ask to join' button")
-            self._save_screenshot("02-before-join-click.png")
-            
-            # Try multiple approaches to click the join button
-            join_success = self._click_join_button()
+            # The pre-injected state machine turns off the microphone and camera,
+            # fills in the name and clicks "Ask to join" as the page renders
+            logger.info("Waiting for the page to fill in the name and click 'Ask to join'")
+            join_state = self._run_join_state_machine()
             
-            if not join_success:
-                logger.error("Failed to click join button")
-                self._save_screenshot("error-join-button.png")
-                return False
+            if join_state != "join-clicked":
+                # Fall back to driving each step from Python
+                logger.warning(f"In-page join stopped at state '{join_state}', falling back to step-by-step join")
+                
+                logger.info("Turning off microphone and camera")
+                self._turn_off_mic_and_camera()
+                
+                if join_state in (None, "waiting-for-name"):
+                    logger.info("Looking for the name input field")
+                    if not self._fill_name_field():
+                        logger.error("Could not fill in name field")
+                        self._save_screenshot("error-name-field.png")
+                        return False
+                
+                logger.info("Looking for 'Ask to join' button")
+                self._save_screenshot("02-before-join-click.png")
+                
+                # Try multiple approaches to click the join button
+                if not self._click_join_button():
+                    logger.error("Failed to click join button")
+                    self._save_screenshot("error-join-button.png")
+                    return False
             
             # Wait to confirm we're in the meeting
             logger.info("Join button clicked, waiting to confirm entry...")
@@ -253,6 +413,48 @@ class GoogleMeetGuestBot:
                 self._save_screenshot("error-exception.png")
             return False
     
+    def _run_join_state_machine(self, timeout=30):
+        """Wait for the in-page state machine to fill the name and click join.
+        
+        The machine is normally pre-injected into every new document; it is
+        started here only if it is missing. The page reacts to DOM changes
+        itself, so Python only polls the reported state every 500 ms.
+        
+        Returns:
+            The last state reported by the page ("join-clicked" on success),
+            or None if the script could not run
+        """
+        try:
+            state = self.driver.execute_script("return window.__joinState;")
+            if state is None:
+                state = self.driver.execute_script(
+                    "window.__botName = arguments[0]; return " + JOIN_STATE_MACHINE_JS,
+                    self.display_name
+                )
+                if state is None:
+                    # The script declined to run (not the Meet page), so don't
+                    # wait out the timeout before falling back
+                    logger.warning("In-page join script is not running on this page")
+                    return None
+            deadline = time.monotonic() + timeout
+            while state != "join-clicked" and time.monotonic() < deadline:
+                time.sleep(0.5)
+                state = self.driver.execute_script("return window.__joinState;")
+            
+            if state != "join-clicked":
+                # Stop the observer so it doesn't race the fallback path
+                self.driver.execute_script(
+                    "window.__joinState = 'abandoned';"
+                    "if (window.__joinObserver) { window.__joinObserver.disconnect(); }"
+                )
+            else:
+                logger.info("Name filled and join button clicked from the page")
+                self._save_screenshot("02a-join-clicked-js.png")
+            return state
+        except Exception as e:
+            logger.warning(f"In-page join failed: {str(e)}")
+            return None
+    
     def stay_in_meeting(self, duration_minutes):
         """Stay in the meeting for the specified duration."""
         if not self.driver:
@@ -263,39 +465,85 @@ class GoogleMeetGuestBot:
         end_time = datetime.now() + timedelta(minutes=duration_minutes)
         logger.info(f"Staying in meeting for {duration_minutes} minutes (until {end_time.strftime('%H:%M:%S')})")
         
+        def meeting_over(driver):
+            """Return a reason string once the meeting is over, otherwise False."""
+            # Check the URL and look for an end message in one round trip
+            current_url, ended = self._get_meeting_state()
+            if not current_url:
+                return "unavailable"
+            if "meet.google.com" not in current_url:
+                return "left"
+            if ended:
+                return "ended"
+            return False
+        
         try:
-            # Use shorter sleep intervals to check if we're still in the meeting
-            while datetime.now() < end_time:
-                # Check if we're still in the meeting every 15 seconds
-                time.sleep(15)
+            # Poll every 15 seconds for the first 2 minutes (guests are often
+            # removed early), then back off to once a minute. Each wait covers
+            # a single poll, cut short so it never runs past the end time.
+            started = datetime.now()
+            while True:
+                remaining = (end_time - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                poll_interval = 15 if (datetime.now() - started).total_seconds() < 120 else 60
+                step = min(poll_interval, remaining)
                 
-                # Check if we're still in a Google Meet URL
-                if self.driver and self.driver.current_url:
-                    current_url = self.driver.current_url
-                    if "meet.google.com" not in current_url:
-                        logger.info("No longer on Google Meet URL - meeting may have ended")
-                        return
-                    
-                    # Try to check if we're in a "meeting ended" state
-                    try:
-                        page_source = self.driver.page_source.lower()
-                        if any(x in page_source for x in ["meeting ended", "you left the meeting", "call has ended"]):
-                            logger.info("Detected meeting end message - leaving meeting")
-                            return
-                    except Exception:
-                        pass
-                else:
+                try:
+                    reason = WebDriverWait(
+                        self.driver, step, poll_frequency=step,
+                        ignored_exceptions=(WebDriverException,)
+                    ).until(meeting_over)
+                except TimeoutException:
+                    continue
+                
+                if reason == "unavailable":
                     # Driver or URL not accessible - meeting might be over
                     logger.warning("Cannot access driver or URL - meeting may have ended")
-                    return
+                elif reason == "left":
+                    logger.info("No longer on Google Meet URL - meeting may have ended")
+                else:
+                    logger.info("Detected meeting end message - leaving meeting")
+                return
                     
         except KeyboardInterrupt:
             logger.info("Received interrupt, leaving meeting early")
+        except Exception as e:
+            logger.warning(f"Lost contact with the meeting: {str(e)}")
         finally:
             logger.info("Meeting duration completed or meeting ended")
     
+    def _get_meeting_state(self):
+        """Return the current URL and whether a meeting-ended message is shown.
+        
+        Both are evaluated in the browser with a single script call, so only
+        a URL and a boolean cross the WebDriver connection instead of the
+        full page source. A result younger than MEETING_STATE_TTL is reused.
+        Returns (None, False) if the driver is unavailable or its session is
+        gone; other WebDriver errors are raised so callers can retry.
+        """
+        if not self.driver:
+            return None, False
+        
+        cached = self._meeting_state_cache
+        if cached and time.monotonic() - cached[0] < MEETING_STATE_TTL:
+            return cached[1]
+        
+        try:
+            current_url, ended = self.driver.execute_script(MEETING_STATE_JS)
+        except InvalidSessionIdException as e:
+            logger.debug("Browser session is gone: %s", e)
+            return None, False
+        
+        state = (current_url, bool(ended))
+        self._meeting_state_cache = (time.monotonic(), state)
+        return state
+    
     def leave_meeting(self):
         """Leave the Google Meet session and stop recording."""
+        # Stop background checks before tearing anything down
+        self._stop_background()
+        
         # Stop recording first if it's active
         if self.record_meeting and self.recorder:
             logger.info("Stopping meeting recording")
@@ -318,295 +566,207 @@ class GoogleMeetGuestBot:
         try:
             logger.info("Attempting to leave meeting")
             
-            # Look for leave/end call button using various strategies
-            leave_button_selectors = [
-                "button[aria-label*='leave' i]", 
-                "button[jsname='CQylAd']",
-                "button:contains('Leave')"
-            ]
-            
-            for selector in leave_button_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            logger.info("Clicked leave button")
-                            time.sleep(2)
-                            return
-                except Exception:
-                    continue
+            # Find the leave/end call button by aria-label, jsname or text in one script call
+            js_code = """
+                const isVisible = b => b.offsetParent !== null || b.getClientRects().length > 0;
+                const button = Array.from(document.querySelectorAll('button')).find(b => isVisible(b) && (
+                    /leave/i.test(b.getAttribute('aria-label') || '') ||
+                    b.getAttribute('jsname') === 'CQylAd' ||
+                    /leave/i.test(b.innerText || '')
+                ));
+                if (button) {
+                    button.click();
+                    return true;
+                }
+                return false;
+            """
             
-            # Try with XPath as backup
-            try:
-                xpath = "//button[contains(., 'Leave') or contains(., 'leave')]"
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                for element in elements:
-                    if element.is_displayed():
-                        element.click()
-                        logger.info("Clicked leave button using XPath")
-                        time.sleep(2)
-                        return
-            except Exception:
-                pass
+            if self.driver.execute_script(js_code):
+                logger.info("Clicked leave button")
+                time.sleep(2)
+                return
             
             logger.warning("Could not find leave button, will close browser directly")
             
         except Exception as e:
             logger.error(f"Error while leaving meeting: {str(e)}")
         finally:
+            # Let pending screenshots finish before the browser goes away
+            self._flush_screenshots()
             if self.driver:
                 self.driver.quit()
                 self.driver = None
     
     def _save_screenshot(self, filename):
-        """Save a screenshot for debugging purposes."""
+        """Queue a screenshot for debugging purposes.
+        
+        Screenshots are written on a background thread so they don't block the
+        join flow. Step screenshots are only taken in debug mode; error
+        screenshots (``error-*``) are always taken. A request for a file that
+        is already queued is coalesced, and requests beyond
+        MAX_PENDING_SCREENSHOTS are dropped so the queue stays bounded.
+        """
         if not self.driver:
             return
         
+        if not self.debug and not filename.startswith("error-"):
+            return
+        
+        with self._screenshot_lock:
+            if filename in self._pending_screenshots:
+                return
+            if len(self._pending_screenshots) >= MAX_PENDING_SCREENSHOTS:
+                logger.debug(f"Screenshot queue full, dropping {filename}")
+                return
+            self._pending_screenshots.add(filename)
+        
+        if self._screenshot_pool is None:
+            self._screenshot_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot")
+        self._screenshot_pool.submit(self._write_screenshot, self.driver, filename)
+    
+    def _write_screenshot(self, driver, filename):
+        """Capture and save a screenshot (runs on the screenshot thread)."""
         try:
             # Create screenshots directory if it doesn't exist
             screenshots_dir = Path("./screenshots")
             screenshots_dir.mkdir(exist_ok=True)
             
             screenshot_path = screenshots_dir / filename
-            self.driver.save_screenshot(str(screenshot_path))
+            driver.save_screenshot(str(screenshot_path))
             logger.info(f"Saved screenshot: {screenshot_path}")
         except Exception as e:
             logger.warning(f"Failed to save screenshot: {str(e)}")
+        finally:
+            with self._screenshot_lock:
+                self._pending_screenshots.discard(filename)
+    
+    def _flush_screenshots(self):
+        """Wait for queued screenshots to be written and stop the screenshot thread."""
+        if self._screenshot_pool is not None:
+            self._screenshot_pool.shutdown(wait=True)
+            self._screenshot_pool = None
     
     def _fill_name_field(self):
         """Find and fill in the name input field."""
-        # Approach 1: Use JavaScript to find and fill name field
-        try:
-            # Escape single quotes in the display name for JavaScript
-            display_name_js = self.display_name.replace("'", "\\'")
-            
-            js_code = f"""
-                const inputs = document.querySelectorAll('input');
-                for (const input of inputs) {{
-                    if ((input.placeholder && input.placeholder.toLowerCase().includes('name')) || 
-                        (input.getAttribute('aria-label') && input.getAttribute('aria-label').toLowerCase().includes('name')) ||
-                        (input.id === 'c11')) {{
-                        
-                        // Clear and set the name
-                        input.value = '{display_name_js}';
-                        
-                        // Trigger events to ensure UI updates
-                        input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                        input.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                        
-                        console.log('Name input filled with JS');
-                        return true;
-                    }}
-                }}
-                return false;
-            """
+        # Test every input against all known name-field patterns in a single
+        # JavaScript pass, instead of one WebDriver round trip per selector.
+        # Patterns are listed from most to least specific.
+        js_code = """
+            const name = arguments[0];
+            const patterns = [
+                ["input[placeholder='Your name']", i => i.placeholder === 'Your name'],
+                ["input[aria-label='Your name']", i => i.getAttribute('aria-label') === 'Your name'],
+                ["#c11", i => i.id === 'c11'],
+                ["input.qdOxv-fmcmS-wGMbrd", i => i.classList.contains('qdOxv-fmcmS-wGMbrd')],
+                ["input[placeholder*='name']", i => (i.placeholder || '').toLowerCase().includes('name')],
+                ["input[aria-label*='name']", i => (i.getAttribute('aria-label') || '').toLowerCase().includes('name')],
+                ["input[type='text']", i => i.type === 'text']
+            ];
+            const inputs = Array.from(document.querySelectorAll('input'))
+                .filter(i => i.offsetParent !== null || i.getClientRects().length > 0);
             
-            result = self.driver.execute_script(js_code)
-            if result:
-                logger.info("Name field filled using JavaScript")
+            for (const [selector, matches] of patterns) {
+                const input = inputs.find(matches);
+                if (input) {
+                    // Set the name and trigger events to ensure UI updates
+                    input.focus();
+                    input.value = name;
+                    input.dispatchEvent(new Event('input', { bubbles: true }));
+                    input.dispatchEvent(new Event('change', { bubbles: true }));
+                    input.dispatchEvent(new Event('blur', { bubbles: true }));
+                    return {filled: true, selector: selector};
+                }
+            }
+            return {filled: false, selector: null};
+        """
+        
+        try:
+            result = self.driver.execute_script(js_code, self.display_name)
+            if result and result.get("filled"):
+                logger.info(f"Name field filled using JavaScript (matched: {result.get('selector')})")
                 time.sleep(1)
                 self._save_screenshot("01a-name-filled-js.png")
                 return True
         except Exception as e:
             logger.warning(f"JavaScript name fill failed: {str(e)}")
         
-        # Approach 2: Use Selenium selectors
-        name_selectors = [
-            "input[placeholder='Your name']",
-            "input[aria-label='Your name']",
-            "#c11",
-            "input.qdOxv-fmcmS-wGMbrd",
-            "input[type='text']"
-        ]
-        
-        for selector in name_selectors:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if element.is_displayed():
-                        element.clear()
-                        element.send_keys(self.display_name)
-                        logger.info(f"Name field filled using selector: {selector}")
-                        time.sleep(1)
-                        self._save_screenshot("01b-name-filled-selenium.png")
-                        return True
-            except Exception as e:
-                logger.debug(f"Error with selector {selector}: {str(e)}")
-        
-        # Approach 3: Use XPath as last resort
-        xpath_patterns = [
-            "//input[@placeholder='Your name']",
-            "//input[contains(@placeholder, 'name')]",
-            "//input[@aria-label='Your name']",
-            "//input[contains(@aria-label, 'name')]",
-            "//input[@type='text']"
-        ]
-        
-        for xpath in xpath_patterns:
-            try:
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                for element in elements:
-                    if element.is_displayed():
-                        element.clear()
-                        element.send_keys(self.display_name)
-                        logger.info(f"Name field filled using XPath: {xpath}")
-                        time.sleep(1)
-                        self._save_screenshot("01c-name-filled-xpath.png")
-                        return True
-            except Exception:
-                continue
-        
         # If we got here, we couldn't find the name field
         return False
     
     def _click_join_button(self):
         """Find and click the 'Ask to join' or 'Join now' button."""
-        # Get info about available buttons for debugging
-        self._log_buttons_info()
-        
-        # Approach 1: Target the specific Ask to join button structure from the Google Meet UI
-        try:
-            js_code = """
-                // Target the exact button structure from Google Meet
-                const askToJoinBtn = document.querySelector('button.UywwFc-LgbsSe[jsname="Qx7uuf"], button.UywwFc-LgbsSe.tusd3.IyLmn');
-                if (askToJoinBtn) {
-                    console.log('Found Ask to join button with exact class structure');
-                    askToJoinBtn.click();
-                    return true;
-                }
-                
-                // Look for span containing the text "Ask to join"
-                const spans = document.querySelectorAll('span.UywwFc-vQzf8d');
-                for (const span of spans) {
-                    if (span.innerText && span.innerText.trim() === 'Ask to join') {
-                        const button = span.closest('button');
-                        if (button) {
-                            console.log('Found Ask to join button via span text');
-                            button.click();
-                            return true;
+        # Evaluate every join-button strategy in a single JavaScript pass,
+        # instead of one WebDriver round trip per selector and per element.
+        js_code = """
+            const isUsable = b => (b.offsetParent !== null || b.getClientRects().length > 0) && !b.disabled;
+            const buttonText = b => (b.innerText || b.textContent || '').trim().toLowerCase();
+            const buttons = Array.from(document.querySelectorAll('button'));
+            
+            const strategies = [
+                // Exact button structure from the Google Meet UI
+                ['exact-class', () => document.querySelector('button.UywwFc-LgbsSe[jsname="Qx7uuf"], button.UywwFc-LgbsSe.tusd3.IyLmn')],
+                // Span containing the text "Ask to join"
+                ['span-text', () => {
+                    for (const span of document.querySelectorAll('span.UywwFc-vQzf8d')) {
+                        if (span.innerText && span.innerText.trim() === 'Ask to join') {
+                            const button = span.closest('button');
+                            if (button && isUsable(button)) return button;
                         }
                     }
-                }
-                
-                // Fallback to previous methods
-                // ...existing JavaScript button find code...
-                return false;
-            """
+                    return null;
+                }],
+                ['jsname', () => buttons.find(b => b.getAttribute('jsname') === 'Qx7uuf' && isUsable(b))],
+                ['text', () => buttons.find(b => isUsable(b) && /ask to join|join now/.test(buttonText(b)))],
+                ['class', () => buttons.find(b => b.classList.contains('UywwFc-LgbsSe') && isUsable(b))]
+            ];
             
+            for (const [strategy, find] of strategies) {
+                const button = find();
+                if (button) {
+                    button.click();
+                    return {clicked: true, strategy: strategy};
+                }
+            }
+            return {clicked: false, strategy: null};
+        """
+        
+        try:
             result = self.driver.execute_script(js_code)
-            if result:
-                logger.info("Ask to join button clicked using exact class targeting")
+            if result and result.get("clicked"):
+                logger.info(f"Join button clicked using JavaScript (strategy: {result.get('strategy')})")
                 time.sleep(2)
-                self._save_screenshot("02a-join-clicked-exact-class.png")
+                self._save_screenshot("02a-join-clicked-js.png")
                 return True
         except Exception as e:
-            logger.warning(f"Exact class targeting failed: {str(e)}")
+            logger.warning(f"JavaScript join button click failed: {str(e)}")
         
-        # Try specific XPath based on the provided HTML structure
-        try:
-            xpath = "//button[contains(@class, 'UywwFc-LgbsSe') and .//span[contains(@class, 'UywwFc-vQzf8d') and text()='Ask to join']]"
-            elements = self.driver.find_elements(By.XPATH, xpath)
-            
-            if elements:
-                for element in elements:
-                    if element.is_displayed() and not element.get_attribute("disabled"):
-                        # Try different click methods
-                        try:
-                            element.click()
-                            logger.info("Ask to join button clicked using exact XPath")
-                        except Exception:
-                            try:
-                                self.driver.execute_script("arguments[0].click();", element)
-                                logger.info("Ask to join button clicked using JavaScript executor")
-                            except Exception as e:
-                                logger.warning(f"Button click failed: {str(e)}")
-                                continue
-                        
-                        time.sleep(2)
-                        self._save_screenshot("02a-join-clicked-exact-xpath.png")
-                        return True
-        except Exception as e:
-            logger.warning(f"Exact XPath targeting failed: {str(e)}")
-        
-        # Continue with the other approaches if the specific targeting fails
-        # Approach 2: Try clicking using CSS selectors
-        join_selectors = [
-            "button.UywwFc-LgbsSe",
-            "button[jsname='Qx7uuf']",
-            "button:contains('Ask to join')",
-            "button:contains('Join now')"
-        ]
-        
-        for selector in join_selectors:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if element.is_displayed() and not element.get_attribute("disabled"):
-                        element.click()
-                        logger.info(f"Join button clicked using selector: {selector}")
-                        time.sleep(2)
-                        self._save_screenshot("02b-join-clicked-selenium.png")
-                        return True
-            except Exception:
-                continue
-        
-        # Approach 3: Try XPath selectors
-        xpath_patterns = [
-            "//button[contains(., 'Ask to join')]",
-            "//button[contains(., 'ask to join')]",
-            "//button[contains(., 'Join now')]",
-            "//button[contains(., 'join now')]",
-            "//button//span[contains(., 'Ask to join')]/parent::button",
-            "//button//span[contains(., 'Join now')]/parent::button"
-        ]
-        
-        for xpath in xpath_patterns:
-            try:
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                for element in elements:
-                    if element.is_displayed() and not element.get_attribute("disabled"):
-                        # Try multiple click methods
-                        try:
-                            # Method 1: Standard click
-                            element.click()
-                            logger.info(f"Join button clicked using XPath (standard): {xpath}")
-                        except Exception:
-                            try:
-                                # Method 2: JavaScript click
-                                self.driver.execute_script("arguments[0].click();", element)
-                                logger.info(f"Join button clicked using XPath (JS): {xpath}")
-                            except Exception:
-                                # Method 3: Actions click
-                                ActionChains(self.driver).move_to_element(element).click().perform()
-                                logger.info(f"Join button clicked using XPath (Actions): {xpath}")
-                        
-                        time.sleep(2)
-                        self._save_screenshot("02c-join-clicked-xpath.png")
-                        return True
-            except Exception:
-                continue
-        
-        # All approaches failed
+        # Log the available buttons to help debug why nothing matched
+        self._log_buttons_info()
         return False
     
     def _log_buttons_info(self):
         """Log information about available buttons for debugging."""
+        # The dump is only useful when debugging a failed join
+        if not self.debug:
+            return
+        
         try:
-            buttons = self.driver.find_elements(By.TAG_NAME, "button")
+            # Collect all button details in one round trip
+            buttons = self.driver.execute_script("""
+                return Array.from(document.querySelectorAll('button')).map(b => ({
+                    text: (b.innerText || '').trim(),
+                    cls: b.getAttribute('class'),
+                    jsname: b.getAttribute('jsname'),
+                    disabled: b.getAttribute('disabled'),
+                    visible: b.offsetParent !== null
+                }));
+            """) or []
             logger.info(f"Found {len(buttons)} buttons on page")
             
             for i, button in enumerate(buttons):
-                try:
-                    if button.is_displayed():
-                        text = button.text.strip() if button.text else "No text"
-                        class_attr = button.get_attribute("class")
-                        jsname = button.get_attribute("jsname")
-                        disabled = button.get_attribute("disabled")
-                        logger.info(f"Button {i}: '{text}' (class: {class_attr}, jsname: {jsname}, disabled: {disabled})")
-                except Exception:
-                    pass
+                if button["visible"]:
+                    text = button["text"] or "No text"
+                    logger.info(f"Button {i}: '{text}' (class: {button['cls']}, jsname: {button['jsname']}, disabled: {button['disabled']})")
         except Exception as e:
             logger.warning(f"Error logging button info: {str(e)}")
     
@@ -627,16 +787,6 @@ class GoogleMeetGuestBot:
                 "//span[contains(text(), 'Copy joining info')]"
             ]
             
-            for xpath in meeting_details_indicators:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, xpath)
-                    for element in elements:
-                        if element.is_displayed():
-                            logger.info(f"Found meeting indicator: {xpath}")
-                            return True
-                except Exception:
-                    continue
-            
             # Method 2: Check for common meeting UI elements
             ui_indicators = [
                 # People panel button
@@ -649,15 +799,33 @@ class GoogleMeetGuestBot:
                 "//button[contains(@aria-label, 'microphone') or contains(@aria-label, 'camera')]"
             ]
             
-            for xpath in ui_indicators:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, xpath)
-                    for element in elements:
-                        if element.is_displayed():
-                            logger.info(f"Found meeting UI element: {xpath}")
-                            return True
-                except Exception:
-                    continue
+            # Probe all indicators in the browser with a single script call,
+            # stopping at the first visible match
+            js_code = """
+                for (const xpath of arguments[0]) {
+                    const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                    for (let i = 0; i < result.snapshotLength; i++) {
+                        const el = result.snapshotItem(i);
+                        if (el.offsetParent !== null || el.getClientRects().length > 0) {
+                            return xpath;
+                        }
+                    }
+                }
+                return null;
+            """
+            
+            matched = None
+            try:
+                matched = self.driver.execute_script(js_code, meeting_details_indicators + ui_indicators)
+            except Exception as e:
+                logger.debug(f"Meeting indicator probe failed: {str(e)}")
+            
+            if matched in meeting_details_indicators:
+                logger.info(f"Found meeting indicator: {matched}")
+                return True
+            if matched:
+                logger.info(f"Found meeting UI element: {matched}")
+                return True
             
             # Method 3: Look for meeting code in URL
             current_url = self.driver.current_url
@@ -674,165 +842,205 @@ class GoogleMeetGuestBot:
     
     def _setup_recording_check(self):
         """Setup periodic recording check to ensure recording is working."""
-        def check_recording():
+        # The recorder and its FFmpeg process are fixed once recording has started
+        recorder = self.recorder
+        process = recorder.recording_process
+        
+        async def check_recording():
             """Periodically check if recording is still working."""
-            check_interval = 30  # seconds
-            total_checks = 20    # Check for 10 minutes (30s * 20 = 600s = 10min)
+            # Check often at first to catch FFmpeg failing early, then back off
+            # while the file keeps growing; any stall resets to the minimum
+            min_interval, max_interval = 10, 30  # seconds
+            check_interval = min_interval
+            prev_size = -1
+            
+            # Once the file has been seen growing a few times, a healthy FFmpeg
+            # process is enough on most ticks; the size is only read every
+            # size_check_every ticks
+            warmup_growths, size_check_every = 2, 4
+            growths = 0
+            tick = 0
             
-            for i in range(total_checks):
-                time.sleep(check_interval)
+            while True:
+                await asyncio.sleep(check_interval)
+                tick += 1
                 
                 # Skip if we're not recording anymore
-                if not hasattr(self, 'recorder') or not self.recorder or not self.recorder.recording:
+                if not recorder.recording:
                     logger.warning("Recording appears to have stopped")
                     break
                 
                 # Verify recording is still active
-                if hasattr(self.recorder, 'recording_process'):
-                    if self.recorder.recording_process.poll() is not None:
-                        logger.error("Recording process has terminated unexpectedly")
-                        break
-                        
-                    # Verify recording file exists and is growing
-                    recording_path = self.recorder.get_recording_path()
-                    if recording_path and recording_path.exists():
-                        file_size = recording_path.stat().st_size
-                        logger.info(f"Recording file size: {file_size / (1024*1024):.2f} MB")
-                        
-                        # Take additional screenshot to show recording is active
-                        if i == 2:  # After ~1 minute
-                            self._save_screenshot("05-recording-in-progress.png")
-                    else:
-                        logger.warning("Recording file does not exist")
-        
-        # Start verification thread
-        verification_thread = threading.Thread(target=check_recording, daemon=True)
-        verification_thread.start()
-        logger.info("Started recording verification thread")
+                if process.poll() is not None:
+                    logger.error("Recording process has terminated unexpectedly")
+                    break
+                
+                if growths >= warmup_growths and tick % size_check_every:
+                    continue
+                
+                # Verify recording file exists and is growing
+                file_size = recorder.get_recording_size()
+                if file_size is None:
+                    logger.warning("Recording file does not exist")
+                    check_interval = min_interval
+                    growths = 0
+                    continue
+                
+                logger.info("Recording file size: %.2f MB", file_size / (1024*1024))
+                
+                if file_size > prev_size:
+                    check_interval = min(check_interval * 1.5, max_interval)
+                    growths += 1
+                else:
+                    logger.warning("Recording file is not growing")
+                    check_interval = min_interval
+                    growths = 0
+                prev_size = file_size
+        
+        async def screenshot_recording():
+            """Take one screenshot to show recording is active."""
+            await asyncio.sleep(60)
+            self._save_screenshot("05-recording-in-progress.png")
+        
+        self._run_background(screenshot_recording())
+        self._run_background(check_recording())
+        logger.info("Started recording verification")
     
     def _setup_meeting_monitor(self):
-        """Setup a thread to monitor for meeting end."""
-        def monitor_meeting():
+        """Setup a background check to monitor for meeting end."""
+        async def monitor_meeting():
             """Check for meeting end conditions periodically."""
-            check_interval = 10  # seconds
+            min_interval, max_interval = 10, 60  # seconds
+            check_interval = min_interval
+            loop = asyncio.get_event_loop()
             
             while True:
-                time.sleep(check_interval)
+                await asyncio.sleep(check_interval)
                 
                 # Skip if driver is not available
                 if not self.driver:
                     logger.warning("Driver not available, stopping meeting monitor")
                     break
                 
+                # Check the URL and look for an end message in one round trip.
+                # The WebDriver call blocks, so it runs on the executor to keep
+                # the recording checks on this loop on schedule.
                 try:
-                    # Check if we've left the Google Meet URL
-                    current_url = self.driver.current_url
-                    if "meet.google.com" not in current_url:
-                        logger.info("No longer on Google Meet URL - meeting ended")
-                        break
-                    
-                    # Check for common phrases indicating meeting has ended
-                    page_source = self.driver.page_source.lower()
-                    if any(x in page_source for x in ["meeting ended", "you left the meeting", "call has ended"]):
-                        logger.info("Detected meeting end message - meeting ended")
-                        break
-                        
+                    current_url, ended = await loop.run_in_executor(None, self._get_meeting_state)
+                except WebDriverException as e:
+                    # Transient browser error - retry later instead of giving up
+                    logger.debug("Meeting state probe failed, retrying: %s", e)
+                    check_interval = min(check_interval * 2, max_interval)
+                    continue
                 except Exception as e:
+                    # Exceptions would vanish silently in the background task
                     logger.warning(f"Error in meeting monitor: {str(e)}")
                     break
+                
+                check_interval = min_interval
+                if not current_url:
+                    logger.warning("Could not read meeting state, stopping meeting monitor")
+                    break
+                
+                # Check if we've left the Google Meet URL
+                if "meet.google.com" not in current_url:
+                    logger.info("No longer on Google Meet URL - meeting ended")
+                    break
+                
+                # Check for common phrases indicating meeting has ended
+                if ended:
+                    logger.info("Detected meeting end message - meeting ended")
+                    break
         
-        # Start monitor thread
-        monitoring_thread = threading.Thread(target=monitor_meeting, daemon=True)
-        monitoring_thread.start()
-        logger.info("Started meeting monitoring thread")
+        self._run_background(monitor_meeting())
+        logger.info("Started meeting monitoring")
+    
+    def _run_background(self, coro):
+        """Schedule a coroutine on the bot's background event loop.
+        
+        All periodic checks share one event loop running in a single daemon
+        thread, which is started on first use.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            
+            def run_loop(loop):
+                asyncio.set_event_loop(loop)
+                loop.run_forever()
+                loop.close()
+            
+            threading.Thread(target=run_loop, args=(self._loop,), daemon=True).start()
+        
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(self._log_background_failure)
+    
+    @staticmethod
+    def _log_background_failure(future):
+        """Log an exception that ended a background check, which would otherwise vanish."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error("Background check failed", exc_info=error)
+    
+    def _stop_background(self):
+        """Cancel the periodic checks and shut down the background event loop."""
+        if self._loop is None:
+            return
+        
+        async def cancel_tasks():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_tasks(), self._loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error stopping background checks: {str(e)}")
+        
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
     
     def _turn_off_mic_and_camera(self):
         """Turn off microphone and camera before joining the meeting."""
         try:
             logger.info("Attempting to turn off microphone and camera")
             
-            # Method 1: Using the data attributes in the HTML structure
-            try:
-                # Find and turn off microphone using the specific attributes in the HTML
-                mic_buttons = self.driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "div[data-tooltip='Turn off microphone (ctrl + d)'], [aria-label='Turn off microphone']"
-                )
-                
-                for button in mic_buttons:
-                    if button.is_displayed():
-                        # Check if already muted
-                        is_muted = button.get_attribute("data-is-muted")
-                        if is_muted != "true":  # Only click if not already muted
-                            logger.info("Clicking microphone button")
-                            button.click()
-                            time.sleep(1)
-                            logger.info("Microphone turned off")
-                            break
-                
-                # Find and turn off camera using the specific attributes in the HTML
-                camera_buttons = self.driver.find_elements(
-                    By.CSS_SELECTOR, 
-                    "div[data-tooltip='Turn off camera (ctrl + e)'], [aria-label='Turn off camera']"
-                )
-                
-                for button in camera_buttons:
-                    if button.is_displayed():
-                        # Check if already muted
-                        is_muted = button.get_attribute("data-is-muted")
-                        if is_muted != "true":  # Only click if not already muted
-                            logger.info("Clicking camera button")
-                            button.click()
-                            time.sleep(1)
-                            logger.info("Camera turned off")
-                            break
-            except Exception as e:
-                logger.warning(f"Could not turn off mic/camera using data attributes: {str(e)}")
-            
-            # Method 2: Using JavaScript to find and click the buttons
-            try:
-                js_code = """
-                    // Find and click microphone button
-                    const micButtons = document.querySelectorAll('[data-tooltip="Turn off microphone (ctrl + d)"], [aria-label="Turn off microphone"]');
-                    let micClicked = false;
-                    
-                    for (const button of micButtons) {
-                        if (button.offsetParent !== null) {  // Check if visible
-                            const isMuted = button.getAttribute("data-is-muted");
-                            if (isMuted !== "true") {
-                                button.click();
-                                micClicked = true;
-                                break;
-                            }
-                        }
+            # Check and toggle both controls in a single round trip
+            result = self.driver.execute_script("""
+                const result = {mic: 'not-found', cam: 'not-found'};
+                const toggles = document.querySelectorAll(
+                    '[data-tooltip="Turn off microphone (ctrl + d)"], [aria-label="Turn off microphone"], ' +
+                    '[data-tooltip="Turn off camera (ctrl + e)"], [aria-label="Turn off camera"]'
+                );
+                for (const button of toggles) {
+                    if (button.offsetParent === null) {
+                        continue;
                     }
-                    
-                    // Find and click camera button
-                    const camButtons = document.querySelectorAll('[data-tooltip="Turn off camera (ctrl + e)"], [aria-label="Turn off camera"]');
-                    let camClicked = false;
-                    
-                    for (const button of camButtons) {
-                        if (button.offsetParent !== null) {  // Check if visible
-                            const isMuted = button.getAttribute("data-is-muted");
-                            if (isMuted !== "true") {
-                                button.click();
-                                camClicked = true;
-                                break;
-                            }
-                        }
+                    const label = (button.getAttribute('aria-label') || '') + (button.getAttribute('data-tooltip') || '');
+                    const device = /microphone/i.test(label) ? 'mic' : 'cam';
+                    if (result[device] !== 'not-found') {
+                        continue;
                     }
-                    
-                    return {micClicked, camClicked};
-                """
-                
-                result = self.driver.execute_script(js_code)
-                if result.get('micClicked'):
-                    logger.info("Microphone turned off using JavaScript")
-                if result.get('camClicked'):
-                    logger.info("Camera turned off using JavaScript")
-                
-            except Exception as e:
-                logger.warning(f"JavaScript approach to turn off mic/camera failed: {str(e)}")
+                    if (button.getAttribute('data-is-muted') !== 'true') {
+                        button.click();
+                        result[device] = 'clicked';
+                    } else {
+                        result[device] = 'already-off';
+                    }
+                }
+                return result;
+            """) or {}
+            
+            for device, label in (("mic", "Microphone"), ("cam", "Camera")):
+                status = result.get(device)
+                if status == "clicked":
+                    logger.info(f"{label} turned off")
+                elif status == "already-off":
+                    logger.info(f"{label} already off")
+                else:
+                    logger.warning(f"{label} toggle not found")
             
             # Take a screenshot after attempting to turn off mic and camera
             self._save_screenshot("01d-after-mic-camera-toggle.png")
@@ -842,8 +1050,62 @@ class GoogleMeetGuestBot:
             # Continue with the meeting join process even if this fails
 
 
-def parse_arguments():
-    """Parse command line arguments."""
+def _parse_arguments_fast(argv):
+    """Parse the common command lines without building an argparse parser.
+    
+    Returns None for anything it doesn't fully understand (--help, unknown or
+    abbreviated options, bad values, a bare --profile-dir), so argparse can
+    handle it and report errors.
+    """
+    values = {
+        "duration": 60,
+        "debug": False,
+        "record": False,
+        "recording_dir": "./recordings",
+        "profile_dir": None,
+    }
+    positionals = []
+    
+    args = iter(argv)
+    for arg in args:
+        if not arg.startswith("-"):
+            positionals.append(arg)
+            continue
+        
+        option, has_value, value = arg.partition("=")
+        if option in ("--debug", "--record") and not has_value:
+            values[option[2:]] = True
+        elif option in ("--duration", "--recording-dir"):
+            if not has_value:
+                value = next(args, None)
+                if value is None:
+                    return None
+                # argparse takes an option-like token as the next option, not
+                # as this one's value (only negative numbers are values)
+                if value.startswith("-") and not (option == "--duration" and value[1:].isdigit()):
+                    return None
+            if option == "--duration":
+                try:
+                    values["duration"] = int(value)
+                except ValueError:
+                    return None
+            else:
+                values["recording_dir"] = value
+        elif option == "--profile-dir" and has_value:
+            values["profile_dir"] = value
+        else:
+            return None
+    
+    if len(positionals) != 2:
+        return None
+    
+    values["url"], values["name"] = positionals
+    return SimpleNamespace(**values)
+
+def _build_parser():
+    """Build the argparse parser for the command line."""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Google Meet Guest Joiner")
     parser.add_argument("url", help="Google Meet URL or code")
     parser.add_argument("name", help="Your display name in the meeting")
@@ -869,24 +1131,34 @@ def parse_arguments():
         default="./recordings",
         help="Directory to save recordings (default: ./recordings)"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        nargs="?",
+        const="./chrome-profile-cache",
+        default=None,
+        help="Keep a persistent Chrome profile in DIR so later joins load faster (default DIR: ./chrome-profile-cache)"
+    )
+    return parser
+
+def parse_arguments():
+    """Parse command line arguments."""
+    args = _parse_arguments_fast(sys.argv[1:])
+    if args is not None:
+        return args
+    return _build_parser().parse_args()
 
 def main():
     """Main entry point for the script."""
     args = parse_arguments()
     
-    # Create recordings directory if it doesn't exist
-    if args.record:
-        recordings_dir = Path(args.recording_dir)
-        recordings_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Recordings will be saved to: {recordings_dir}")
-    
     # Initialize the bot with recording options if specified
     bot = GoogleMeetGuestBot(
         display_name=args.name, 
         debug=args.debug,
         record_meeting=args.record,
-        recording_output_dir=args.recording_dir
+        recording_output_dir=args.recording_dir,
+        profile_dir=args.profile_dir
     )
     
     try:
@@ -4,29 +4,323 @@ Meeting Recorder Module
 Provides functionality to record screen and audio during meetings.
 Uses FFmpeg for efficient video/audio capture.
 """
+import collections
+import functools
 import os
 import subprocess
 import platform
 import logging
-import time
+import queue
+import re
+import shutil
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# python-xlib is optional; it reads the screen size over the existing X
+# connection instead of spawning xrandr
+try:
+    from Xlib import display as xdisplay
+except ImportError:
+    xdisplay = None
+
+# Writes to FFmpeg's stdin are split into page-sized chunks
+STDIN_CHUNK_SIZE = 4096
+
+# Most recent FFmpeg stderr lines kept for error reports
+STDERR_TAIL_LINES = 500
+
+# Longest wait for the first encoded frame before the recording is assumed to be running
+STARTUP_TIMEOUT = 2.0
+
+# Windows priority class for the recording process
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+
+# Seconds between recording progress log messages
+STATUS_LOG_INTERVAL = 300
+
+# Formats the separate audio file can be written in
+AUDIO_FORMATS = ("mp3", "m4a")
+
+# Input options that skip FFmpeg's stream analysis. Capture devices describe
+# their streams up front, so probing only delays the start of the recording.
+LIVE_INPUT_OPTIONS = ["-probesize", "32", "-analyzeduration", "0", "-fflags", "+nobuffer"]
+# Same for the finished recording, whose MP4 header already describes every stream
+FILE_INPUT_OPTIONS = ["-probesize", "32", "-analyzeduration", "0"]
+
+# Hardware H.264 encoders in order of preference, with their output options
+HW_ENCODERS = (
+    ("h264_nvenc", ["-preset", "p5", "-cq", "28", "-pix_fmt", "yuv420p"]),
+    ("h264_qsv", ["-preset", "veryfast", "-global_quality", "28", "-pix_fmt", "nv12"]),
+    ("h264_amf", ["-quality", "speed", "-rc", "cqp", "-qp_i", "28", "-qp_p", "28", "-pix_fmt", "yuv420p"]),
+    ("h264_videotoolbox", ["-realtime", "1", "-b:v", "2M", "-pix_fmt", "yuv420p"]),
+)
+# Software fallback when no hardware encoder works
+SOFTWARE_ENCODER_ARGS = [
+    "-c:v", "libx264",
+    "-preset", "ultrafast",  # Fast encoding for minimal CPU usage
+    "-crf", "28",  # Compression quality (higher = smaller file)
+    "-pix_fmt", "yuv420p",  # Compatible pixel format
+]
+
+# Device names in `ffmpeg -list_devices true -f dshow` output (stderr bytes)
+_DSHOW_ALT_NAME_RE = re.compile(rb'Alternative name\s+"([^"]+)"')
+# Current screen size on the "Screen 0: minimum ..., current W x H, ..." line of xrandr
+_XRANDR_CURRENT_RE = re.compile(r'current (\d+) x (\d+)')
+# FFmpeg progress line once a frame has been encoded. "Press [q]" comes too early:
+# encoders are only opened when the first frame arrives, and can still fail then.
+_FFMPEG_PROGRESS_RE = re.compile(r'frame=\s*[1-9]')
+# PulseAudio monitor sources in `pactl list sources` output; like
+# detect_audio_devices.py, only names ending in ".monitor" count
+_PULSE_MONITOR_RE = re.compile(r'^\s*Name:\s*(\S+\.monitor)\s*$', re.MULTILINE)
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_available() -> bool:
+    """Check if FFmpeg is available on the system."""
+    try:
+        subprocess.run(
+            ["ffmpeg", "-version"], 
+            stdout=subprocess.DEVNULL, 
+            stderr=subprocess.DEVNULL,
+            check=False
+        )
+        logger.info("FFmpeg is installed and accessible")
+        return True
+    except FileNotFoundError:
+        logger.warning(
+            "FFmpeg not found. Recording will be disabled. "
+            "Please install FFmpeg (https://ffmpeg.org/download.html) "
+            "and make sure it's in your PATH."
+        )
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_hw_encoder() -> Optional[Tuple[str, ...]]:
+    """Return the FFmpeg video options for the first working hardware encoder.
+    
+    An encoder being compiled into FFmpeg doesn't mean the GPU is present, so
+    each listed candidate is checked with a one-frame test encode. Returns
+    None if no hardware encoder works.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=False
+        )
+    except FileNotFoundError:
+        return None
+    
+    for encoder, options in HW_ENCODERS:
+        if encoder not in result.stdout:
+            continue
+        
+        test = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "color=size=256x256:rate=1",
+             "-frames:v", "1", "-c:v", encoder, *options, "-f", "null", "-"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False
+        )
+        if test.returncode == 0:
+            logger.info(f"Using hardware video encoder: {encoder}")
+            return ("-c:v", encoder, *options)
+    
+    logger.info("No hardware video encoder available, using libx264")
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_screen_resolution(system: str) -> Tuple[int, int]:
+    """Get the screen resolution for recording."""
+    try:
+        if system == "Windows":
+            from win32api import GetSystemMetrics
+            width = GetSystemMetrics(0)
+            height = GetSystemMetrics(1)
+            return width, height
+        elif system == "Darwin":  # macOS
+            result = subprocess.run(
+                ["system_profiler", "SPDisplaysDataType"], 
+                capture_output=True, 
+                text=True
+            )
+            output = result.stdout
+            resolution_line = [line for line in output.split('\n') if "Resolution" in line][0]
+            resolution = resolution_line.split(':')[1].strip()
+            width, height = map(int, resolution.split(' x '))
+            return width, height
+        elif system == "Linux":
+            if xdisplay is not None:
+                try:
+                    x_display = xdisplay.Display()
+                    screen = x_display.screen()
+                    width, height = screen.width_in_pixels, screen.height_in_pixels
+                    x_display.close()
+                    return width, height
+                except Exception as e:
+                    logger.debug(f"Xlib screen query failed, falling back to xrandr: {e}")
+            
+            result = subprocess.run(
+                ["xrandr", "--current"], 
+                capture_output=True, 
+                text=True
+            )
+            width, height = map(int, _XRANDR_CURRENT_RE.search(result.stdout).groups())
+            return width, height
+        else:
+            # Default resolution if detection fails
+            return 1920, 1080
+    except Exception as e:
+        logger.warning(f"Failed to detect screen resolution: {e}")
+        return 1920, 1080  # Default fallback resolution
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_audio_source(system: str) -> Optional[str]:
+    """Get the appropriate audio source based on the platform."""
+    if system == "Windows":
+        # First try to detect available audio devices
+        try:
+            # List available DirectShow devices
+            command = ["ffmpeg", "-list_devices", "true", "-f", "dshow", "-i", "dummy"]
+            result = subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                check=False
+            )
+            
+            # Only look at the audio section, which runs until the video
+            # section header or the end of the output
+            output = result.stderr
+            start = output.find(b"DirectShow audio devices")
+            audio_devices = []
+            if start != -1:
+                end = output.find(b"DirectShow video devices", start)
+                section = output[start:end if end != -1 else len(output)]
+                audio_devices = [
+                    name.decode("utf-8", "replace") for name in _DSHOW_ALT_NAME_RE.findall(section)
+                ]
+            
+            if audio_devices:
+                logger.info(f"Found audio devices: {audio_devices}")
+                
+                # Look for common audio devices used for system sound capture
+                for device in audio_devices:
+                    # Check for common system audio capture device names
+                    if any(name.lower() in device.lower() for name in [
+                        "stereo mix", "wave out", "audio output", "virtual audio", 
+                        "cable output", "voicemeeter", "audio render"
+                    ]):
+                        logger.info(f"Selected audio device: {device}")
+                        return f"audio={device}"
+                
+                # If no ideal device found, try the first audio device
+                if audio_devices:
+                    logger.info(f"Using first available audio device: {audio_devices[0]}")
+                    return f"audio={audio_devices[0]}"
+            
+            logger.warning("No suitable audio input devices found, recording without audio")
+            return None
+            
+        except Exception as e:
+            logger.warning(f"Error detecting audio devices: {e}")
+            logger.warning("Falling back to recording without audio")
+            return None
+    
+    elif system == "Darwin":  # macOS
+        # macOS approach - use default audio device
+        return "0"  # Default audio input on macOS
+    
+    elif system == "Linux":
+        try:
+            # Try to detect PulseAudio devices
+            command = ["pactl", "list", "sources"]
+            result = subprocess.run(
+                command, 
+                stdout=subprocess.PIPE, 
+                stderr=subprocess.DEVNULL,
+                text=True, 
+                check=False
+            )
+            
+            if result.returncode == 0:
+                match = _PULSE_MONITOR_RE.search(result.stdout)
+                if match:
+                    device = match.group(1)
+                    logger.info(f"Found PulseAudio monitor device: {device}")
+                    return device
+            
+            # Fallback to default
+            return "default"
+            
+        except Exception:
+            logger.warning("Error detecting PulseAudio devices, using default")
+            return "default"
+    
+    else:
+        logger.warning(f"Unsupported platform for audio capture: {system}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _batch_scheduling_prefix() -> Tuple[str, ...]:
+    """Return the command prefix that starts a process under SCHED_BATCH on Linux."""
+    if not sys.platform.startswith("linux"):
+        return ()
+    chrt = shutil.which("chrt")
+    if not chrt:
+        logger.debug("chrt not found, recording will use the default scheduling policy")
+        return ()
+    return (chrt, "--batch", "0")
+
+
+def _with_scheduling(command: list) -> Tuple[list, Dict[str, Any]]:
+    """Return the command and Popen options that run FFmpeg as a background batch job.
+    
+    The policy is set before FFmpeg starts so that all of its encoder and
+    capture threads inherit it. On Linux chrt puts the process under
+    SCHED_BATCH, which lets FFmpeg run in longer slices with fewer
+    preemptions; on Windows it gets the below-normal priority class so it
+    yields to the browser.
+    """
+    if sys.platform == "win32":
+        return command, {"creationflags": BELOW_NORMAL_PRIORITY_CLASS}
+    return [*_batch_scheduling_prefix(), *command], {}
+
+
 class MeetingRecorder:
     """Records screen and audio during meetings."""
     
-    def __init__(self, output_dir: str = "./recordings", prefix: str = "meeting", meeting_id: str = None):
+    def __init__(self, output_dir: str = "./recordings", prefix: str = "meeting", meeting_id: str = None,
+                 hardware_encoding: bool = True, audio_source: Optional[str] = None,
+                 audio_format: str = "mp3"):
         """Initialize the recorder.
         
         Args:
             output_dir: Directory to save recordings
             prefix: Prefix for recording filenames
             meeting_id: Meeting ID to include in the filename
+            hardware_encoding: Encode video on the GPU when a hardware encoder works
+            audio_source: FFmpeg audio input to record from; detected when not given
+            audio_format: "mp3" to encode the audio track, or "m4a" to copy the AAC as-is
         """
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format} (expected one of {', '.join(AUDIO_FORMATS)})")
+        
         self.output_dir = Path(output_dir)
+        self.hardware_encoding = hardware_encoding
+        self.audio_source = audio_source
+        self.audio_format = audio_format
         self.prefix = prefix
         self.meeting_id = meeting_id if meeting_id else "unknown"
         self.recording = False
@@ -34,173 +328,89 @@ class MeetingRecorder:
         self.current_recording_path = None
         self.current_audio_path = None
         self.start_time = None
-        
-        # Create output directory if it doesn't exist
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._recording_fd = None  # Read-only descriptor on the recording file, for cheap size checks
+        self._recording_fd_lock = threading.Lock()  # Size checks run on several threads
+        self._mp3_output_index = None  # Where the live MP3 output starts in the FFmpeg command
+        self._audio_input_span = None  # Slice of the FFmpeg command holding a separate audio input
+        self._stdin_queue = None  # Data waiting to be written to FFmpeg's stdin
+        self._stdin_thread = None  # Thread that owns all writes to FFmpeg's stdin
+        self._stopping = False  # Set by stop_recording so the exit watcher stays quiet
+        self._stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)  # Last lines FFmpeg wrote to stderr
+        self._stderr_thread = None  # Thread draining FFmpeg's stderr into _stderr_tail
+        self._ffmpeg_ready = threading.Event()  # Set once FFmpeg encodes a frame or closes stderr
+        self._warm_up_thread = None  # Thread running the device and encoder probes ahead of time
         
         # Check if FFmpeg is installed
         self._check_ffmpeg_installed()
     
     def _check_ffmpeg_installed(self) -> bool:
-        """Check if FFmpeg is available on the system."""
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=False
-            )
-            logger.info("FFmpeg is installed and accessible")
-            return True
-        except FileNotFoundError:
-            logger.warning(
-                "FFmpeg not found. Recording will be disabled. "
-                "Please install FFmpeg (https://ffmpeg.org/download.html) "
-                "and make sure it's in your PATH."
-            )
-            return False
+        """Check if FFmpeg is available on the system (probed once per process)."""
+        return _ffmpeg_available()
     
     def _get_screen_resolution(self) -> Tuple[int, int]:
-        """Get the screen resolution for recording."""
-        try:
-            if platform.system() == "Windows":
-                from win32api import GetSystemMetrics
-                width = GetSystemMetrics(0)
-                height = GetSystemMetrics(1)
-                return width, height
-            elif platform.system() == "Darwin":  # macOS
-                result = subprocess.run(
-                    ["system_profiler", "SPDisplaysDataType"], 
-                    capture_output=True, 
-                    text=True
-                )
-                output = result.stdout
-                resolution_line = [line for line in output.split('\n') if "Resolution" in line][0]
-                resolution = resolution_line.split(':')[1].strip()
-                width, height = map(int, resolution.split(' x '))
-                return width, height
-            elif platform.system() == "Linux":
-                result = subprocess.run(
-                    ["xrandr"], 
-                    capture_output=True, 
-                    text=True
-                )
-                output = result.stdout
-                current_line = [line for line in output.split('\n') if "*" in line][0]
-                resolution = current_line.split()[0]
-                width, height = map(int, resolution.split('x'))
-                return width, height
-            else:
-                # Default resolution if detection fails
-                return 1920, 1080
-        except Exception as e:
-            logger.warning(f"Failed to detect screen resolution: {e}")
-            return 1920, 1080  # Default fallback resolution
+        """Get the screen resolution for recording (probed once per process)."""
+        return _detect_screen_resolution(platform.system())
     
     def _get_audio_source(self) -> Optional[str]:
-        """Get the appropriate audio source based on the platform."""
-        system = platform.system()
+        """Get the appropriate audio source based on the platform (probed once per process)."""
+        if self.audio_source:
+            return self.audio_source
+        return _detect_audio_source(platform.system())
+    
+    @classmethod
+    def refresh_devices(cls):
+        """Forget the cached screen resolution and audio source.
         
-        if system == "Windows":
-            # First try to detect available audio devices
-            try:
-                # List available DirectShow devices
-                command = ["ffmpeg", "-list_devices", "true", "-f", "dshow", "-i", "dummy"]
-                result = subprocess.run(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    check=False
-                )
-                
-                # Check output for available audio devices
-                output = result.stderr
-                audio_devices = []
-                capture_audio = False
-                
-                for line in output.split('\n'):
-                    if "DirectShow audio devices" in line:
-                        capture_audio = True
-                    elif "DirectShow video devices" in line or not line:
-                        capture_audio = False
-                    
-                    if capture_audio and "Alternative name" in line:
-                        device_name = line.split('"')[1]
-                        audio_devices.append(device_name)
-                
-                if audio_devices:
-                    logger.info(f"Found audio devices: {audio_devices}")
-                    
-                    # Look for common audio devices used for system sound capture
-                    for device in audio_devices:
-                        # Check for common system audio capture device names
-                        if any(name.lower() in device.lower() for name in [
-                            "stereo mix", "wave out", "audio output", "virtual audio", 
-                            "cable output", "voicemeeter", "audio render"
-                        ]):
-                            logger.info(f"Selected audio device: {device}")
-                            return f"audio={device}"
-                    
-                    # If no ideal device found, try the first audio device
-                    if audio_devices:
-                        logger.info(f"Using first available audio device: {audio_devices[0]}")
-                        return f"audio={audio_devices[0]}"
-                
-                logger.warning("No suitable audio input devices found, recording without audio")
-                return None
-                
-            except Exception as e:
-                logger.warning(f"Error detecting audio devices: {e}")
-                logger.warning("Falling back to recording without audio")
-                return None
+        Call this after plugging in a display or audio device so the next
+        recording probes the system again.
+        """
+        _detect_screen_resolution.cache_clear()
+        _detect_audio_source.cache_clear()
+    
+    def warm_up(self):
+        """Run the device and encoder probes on a background thread.
         
-        elif system == "Darwin":  # macOS
-            # macOS approach - use default audio device
-            return "0"  # Default audio input on macOS
+        Call this well before start_recording (e.g. while the browser joins
+        the meeting) so starting the recording doesn't wait for them.
+        """
+        if self._warm_up_thread is not None or not self._check_ffmpeg_installed():
+            return
         
-        elif system == "Linux":
+        def probe():
             try:
-                # Try to detect PulseAudio devices
-                command = ["pactl", "list", "sources"]
-                result = subprocess.run(
-                    command, 
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE,
-                    text=True, 
-                    check=False
-                )
-                
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if "monitor" in line.lower() and "name:" in line.lower():
-                            device = line.split("name:")[1].strip()
-                            logger.info(f"Found PulseAudio monitor device: {device}")
-                            return device
-                
-                # Fallback to default
-                return "default"
-                
-            except Exception:
-                logger.warning("Error detecting PulseAudio devices, using default")
-                return "default"
+                self._get_screen_resolution()
+                self._get_audio_source()
+                if self.hardware_encoding:
+                    _detect_hw_encoder()
+            except Exception as e:
+                logger.warning(f"Recording warm-up failed: {str(e)}")
         
-        else:
-            logger.warning(f"Unsupported platform for audio capture: {system}")
-            return None
+        self._warm_up_thread = threading.Thread(target=probe, name="recorder-warm-up", daemon=True)
+        self._warm_up_thread.start()
     
     def _get_ffmpeg_command(self) -> list:
         """Build the FFmpeg command for recording."""
+        # Let a running warm-up finish rather than probing twice
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join()
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         # Include meeting ID in the filename
         filename = f"{self.prefix}_{self.meeting_id}_{timestamp}.mp4"
+        
+        # Create the output directory on first use; it usually exists already
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+        
+        self._close_recording_fd()
         self.current_recording_path = self.output_dir / filename
         
         # Also set the path for audio extraction
-        self.current_audio_path = self.output_dir / f"{self.prefix}_{self.meeting_id}_{timestamp}.mp3"
+        self.current_audio_path = self.output_dir / f"{self.prefix}_{self.meeting_id}_{timestamp}.{self.audio_format}"
         
         width, height = self._get_screen_resolution()
         audio_source = self._get_audio_source()
+        self._audio_input_span = None
         
         system = platform.system()
         
@@ -211,15 +421,19 @@ class MeetingRecorder:
                 "-f", "gdigrab",
                 "-framerate", "15",  # Lower framerate for less CPU usage
                 "-video_size", f"{width}x{height}",
+                *LIVE_INPUT_OPTIONS,
                 "-i", "desktop",
             ]
             
             # Add audio if we have a source
             if (audio_source):
+                audio_start = len(command)
                 command.extend([
                     "-f", "dshow",
+                    *LIVE_INPUT_OPTIONS,
                     "-i", audio_source,
                 ])
+                self._audio_input_span = slice(audio_start, len(command))
 
         elif system == "Darwin":  # macOS
             # AVFoundation grabber for macOS
@@ -228,6 +442,7 @@ class MeetingRecorder:
                 "-f", "avfoundation",
                 "-framerate", "15",
                 "-video_size", f"{width}x{height}",
+                *LIVE_INPUT_OPTIONS,
                 "-i", "1:0",  # "1" is screen, "0" is system audio
             ]
             
@@ -238,31 +453,47 @@ class MeetingRecorder:
                 "-f", "x11grab",
                 "-framerate", "15",
                 "-video_size", f"{width}x{height}",
+                *LIVE_INPUT_OPTIONS,
                 "-i", ":0.0",
             ]
             
             # Add audio if we have a source
             if audio_source:
+                audio_start = len(command)
                 command.extend([
                     "-f", "pulse",
+                    *LIVE_INPUT_OPTIONS,
                     "-i", audio_source,
                 ])
+                self._audio_input_span = slice(audio_start, len(command))
             
         else:
             logger.error(f"Unsupported platform for recording: {system}")
             return []
         
-        # Common output options for any platform
+        # Common output options for any platform, encoding video on the GPU
+        # when possible
+        video_options = _detect_hw_encoder() if self.hardware_encoding else None
+        command.extend(video_options or SOFTWARE_ENCODER_ARGS)
         command.extend([
-            "-c:v", "libx264",
-            "-preset", "ultrafast",  # Fast encoding for minimal CPU usage
-            "-crf", "28",  # Compression quality (higher = smaller file)
-            "-pix_fmt", "yuv420p",  # Compatible pixel format
             "-c:a", "aac",
             "-b:a", "128k",  # Audio bitrate
             str(self.current_recording_path)
         ])
         
+        # Write the MP3 from the live audio as a second output, so the MP4
+        # doesn't have to be decoded again after the meeting. An M4A is a
+        # plain copy of the AAC track, which is cheap to do afterwards.
+        has_audio = self.audio_format == "mp3" and (system == "Darwin" or bool(audio_source))
+        self._mp3_output_index = len(command) if has_audio else None
+        if has_audio:
+            command.extend([
+                "-vn",  # No video
+                "-c:a", "libmp3lame",
+                "-q:a", "4",  # Quality setting (0-9, lower is better)
+                str(self.current_audio_path)
+            ])
+        
         return command
     
     def start_recording(self) -> bool:
@@ -282,51 +513,56 @@ class MeetingRecorder:
             # First, try with audio
             try:
                 # Start the FFmpeg process
+                popen_command, scheduling_options = _with_scheduling(command)
                 self.recording_process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
+                    popen_command,
+                    stdout=subprocess.DEVNULL,
                     stderr=subprocess.PIPE,
                     stdin=subprocess.PIPE,
-                    text=True
+                    text=True,
+                    # Device names can be UTF-8 whatever the locale; a decode
+                    # error would otherwise end the drain thread
+                    encoding="utf-8",
+                    errors="replace",
+                    **scheduling_options
                 )
-                
-                # Wait a short time to check for immediate failures
-                time.sleep(1)
+                self._start_stderr_drain(self.recording_process)
                 
                 # Verify that recording started successfully
-                if self.recording_process.poll() is not None:
-                    exit_code = self.recording_process.poll()
-                    stderr_output = self.recording_process.stderr.read() if self.recording_process.stderr else "No error output"
+                exit_code = self._wait_for_startup(self.recording_process)
+                if exit_code is not None:
+                    stderr_output = self._stderr_output()
                     logger.error(f"Recording process failed with audio: {stderr_output}")
                     
-                    # If there's an audio error, try again without audio
-                    if "audio" in stderr_output.lower() and "error" in stderr_output.lower():
+                    # If there's an audio error, try again without the separate audio input
+                    if (self._audio_input_span is not None
+                            and "audio" in stderr_output.lower() and "error" in stderr_output.lower()):
                         logger.warning("Audio capture failed, trying again without audio...")
                         
-                        # Create command without audio
-                        video_only_command = [x for x in command]
-                        # Remove any audio-related parameters - this is a simplistic approach
-                        # but should remove the -f dshow and -i audio=... parameters
-                        if "-f" in video_only_command and "dshow" in video_only_command:
-                            idx = video_only_command.index("-f")
-                            if idx + 2 < len(video_only_command) and "audio" in video_only_command[idx + 2]:
-                                # Remove -f dshow -i audio=...
-                                del video_only_command[idx:idx+3]
+                        # Drop the MP3 output first, then the audio input before it
+                        video_only_command = list(command)
+                        if self._mp3_output_index is not None:
+                            del video_only_command[self._mp3_output_index:]
+                        del video_only_command[self._audio_input_span]
                         
                         logger.info(f"Trying video-only command: {video_only_command}")
                         
+                        popen_command, scheduling_options = _with_scheduling(video_only_command)
                         self.recording_process = subprocess.Popen(
-                            video_only_command,
-                            stdout=subprocess.PIPE,
+                            popen_command,
+                            stdout=subprocess.DEVNULL,
                             stderr=subprocess.PIPE,
                             stdin=subprocess.PIPE,
-                            text=True
+                            text=True,
+                            encoding="utf-8",
+                            errors="replace",
+                            **scheduling_options
                         )
+                        self._start_stderr_drain(self.recording_process)
                         
-                        time.sleep(1)
-                        if self.recording_process.poll() is not None:
-                            exit_code = self.recording_process.poll()
-                            stderr_output = self.recording_process.stderr.read() if self.recording_process.stderr else "No error output"
+                        exit_code = self._wait_for_startup(self.recording_process)
+                        if exit_code is not None:
+                            stderr_output = self._stderr_output()
                             logger.error(f"Video-only recording also failed with code {exit_code}: {stderr_output}")
                             self.recording_process = None
                             return False
@@ -345,6 +581,7 @@ class MeetingRecorder:
                 return False
             
             # If we get here, one of the recording attempts worked
+            self._start_stdin_writer()
             self.recording = True
             self.start_time = datetime.now()
             logger.info("Recording started successfully at %s", self.start_time)
@@ -361,38 +598,137 @@ class MeetingRecorder:
             self.recording_process = None
             return False
 
+    def _start_stderr_drain(self, process):
+        """Keep reading FFmpeg's stderr so a full pipe can never stall the recording."""
+        self._stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self._ffmpeg_ready = threading.Event()
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr,
+            args=(process, self._stderr_tail, self._ffmpeg_ready),
+            daemon=True
+        )
+        self._stderr_thread.start()
+    
+    @staticmethod
+    def _drain_stderr(process, tail, ready):
+        """Append each stderr line to the bounded tail (runs on the drain thread).
+        
+        Sets ``ready`` when FFmpeg reports its first encoded frame, or when stderr closes.
+        """
+        try:
+            for line in process.stderr:
+                tail.append(line)
+                if not ready.is_set() and _FFMPEG_PROGRESS_RE.search(line):
+                    ready.set()
+        except (OSError, ValueError):
+            # The pipe was closed underneath us
+            pass
+        finally:
+            ready.set()
+    
+    def _wait_for_startup(self, process, timeout: float = STARTUP_TIMEOUT) -> Optional[int]:
+        """Wait until FFmpeg has encoded its first frame or exits.
+        
+        Returns FFmpeg's exit code if it failed to start, or None if it is running.
+        """
+        self._ffmpeg_ready.wait(timeout)
+        if self._stderr_thread is not None and not self._stderr_thread.is_alive():
+            # stderr closed, so FFmpeg is exiting; give it a moment to be reaped
+            try:
+                return process.wait(1)
+            except subprocess.TimeoutExpired:
+                pass
+        return process.poll()
+    
+    def _stderr_output(self, timeout: float = 2.0) -> str:
+        """Return the last lines FFmpeg wrote to stderr.
+        
+        Call this once FFmpeg has exited; it waits briefly for the drain thread
+        to reach the end of the pipe.
+        """
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout)
+        return "".join(self._stderr_tail) or "No error output"
+    
+    def _start_stdin_writer(self):
+        """Start the thread that owns all writes to FFmpeg's stdin."""
+        self._stdin_queue = queue.Queue()
+        self._stdin_thread = threading.Thread(
+            target=self._write_stdin,
+            args=(self.recording_process, self._stdin_queue),
+            daemon=True
+        )
+        self._stdin_thread.start()
+    
+    def _write_stdin(self, process, data_queue):
+        """Write queued data to FFmpeg's stdin in page-sized chunks (runs on the writer thread)."""
+        fd = process.stdin.fileno()
+        while True:
+            data = data_queue.get()
+            if data is None:
+                return
+            
+            view = memoryview(data)
+            try:
+                while view:
+                    written = os.write(fd, view[:STDIN_CHUNK_SIZE])
+                    view = view[written:]
+            except OSError as e:
+                # FFmpeg has closed its stdin or exited
+                logger.debug(f"Could not write to FFmpeg stdin: {e}")
+                return
+    
+    def _send_to_ffmpeg(self, data: bytes):
+        """Queue data for FFmpeg's stdin without blocking the caller."""
+        if self._stdin_queue is not None:
+            self._stdin_queue.put(data)
+    
+    def sync(self, timeout: Optional[float] = None):
+        """Wait until everything queued for FFmpeg's stdin has been written."""
+        if self._stdin_thread is None:
+            return
+        
+        self._stdin_queue.put(None)
+        self._stdin_thread.join(timeout)
+        self._stdin_thread = None
+        self._stdin_queue = None
+    
     def _start_verification_thread(self):
-        """Start a thread to verify recording is still working."""
-        import threading
+        """Start threads that watch the recording process and report progress.
         
-        def verify_recording():
-            while self.recording and self.recording_process:
-                # Check if process is still running
-                if self.recording_process.poll() is not None:
-                    exit_code = self.recording_process.poll()
-                    stderr_output = self.recording_process.stderr.read() if self.recording_process.stderr else "No error output"
-                    logger.error(f"Recording process terminated unexpectedly with code {exit_code}. Error: {stderr_output}")
-                    self.recording = False
-                    break
-                
-                # Log recording status every minute
+        One thread blocks in wait() on the FFmpeg process, so an unexpected
+        exit is noticed immediately without polling. A second thread logs
+        the duration and file size every STATUS_LOG_INTERVAL seconds.
+        """
+        process = self.recording_process
+        finished = threading.Event()
+        self._stopping = False
+        
+        def wait_for_exit():
+            exit_code = process.wait()
+            finished.set()
+            if self._stopping:
+                return
+            
+            stderr_output = self._stderr_output()
+            logger.error(f"Recording process terminated unexpectedly with code {exit_code}. Error: {stderr_output}")
+            self.recording = False
+        
+        def log_status():
+            while not finished.wait(STATUS_LOG_INTERVAL):
                 current_duration = datetime.now() - self.start_time
                 logger.info(f"Recording in progress. Duration: {current_duration}")
                 
-                # Check if output file is growing (every 60 seconds)
-                if self.current_recording_path.exists():
-                    file_size = self.current_recording_path.stat().st_size
+                # Check if output file is growing
+                file_size = self.get_recording_size()
+                if file_size is not None:
                     logger.info(f"Current recording file size: {file_size / (1024*1024):.2f} MB")
                 else:
                     logger.warning("Recording file not created yet or missing")
-                
-                # Sleep for 60 seconds before next check
-                time.sleep(60)
         
-        # Start verification thread
-        verification_thread = threading.Thread(target=verify_recording, daemon=True)
-        verification_thread.start()
-        logger.info("Started recording verification thread")
+        threading.Thread(target=wait_for_exit, daemon=True).start()
+        threading.Thread(target=log_status, daemon=True).start()
+        logger.info("Started recording verification threads")
     
     def stop_recording(self) -> bool:
         """Stop the current recording."""
@@ -403,11 +739,16 @@ class MeetingRecorder:
         try:
             logger.info("Stopping recording")
             
+            # Let the exit watcher know this exit is expected
+            self._stopping = True
+            
             # On Windows, we need to send 'q' to ffmpeg to stop gracefully
             if platform.system() == "Windows":
+                # Send 'q' to stdin to gracefully quit ffmpeg
+                self._send_to_ffmpeg(b"q")
+                self.sync(timeout=5)
                 try:
-                    # Send 'q' to stdin to gracefully quit ffmpeg
-                    self.recording_process.communicate(input='q', timeout=5)
+                    self.recording_process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
                     logger.warning("FFmpeg process didn't respond to 'q' command, terminating...")
                     self.recording_process.terminate()
@@ -423,17 +764,23 @@ class MeetingRecorder:
                 logger.warning("FFmpeg process didn't terminate, forcing...")
                 self.recording_process.kill()
             
+            # FFmpeg has exited, so this is the final size (None if never created)
+            file_size = self.get_recording_size()
+            self._close_recording_fd()
+            self.sync(timeout=1)
+            
             duration = datetime.now() - self.start_time
             logger.info("Recording completed. Duration: %s", duration)
             
             # Check if the recording file exists and has content
-            if self.current_recording_path and self.current_recording_path.exists():
-                file_size = self.current_recording_path.stat().st_size
+            if file_size is not None:
                 logger.info(f"Recording saved to: {self.current_recording_path} (Size: {file_size / (1024*1024):.2f} MB)")
                 
                 if file_size > 0:
-                    # Extract audio to MP3
-                    self._extract_audio_to_mp3()
+                    # The MP3 is normally written live alongside the video;
+                    # only extract it afterwards if that didn't happen
+                    if self.get_audio_path() is None:
+                        self._extract_audio()
                 else:
                     logger.warning(f"Recording file is empty (0 bytes). Check FFmpeg configuration.")
             else:
@@ -448,22 +795,35 @@ class MeetingRecorder:
             logger.error(f"Failed to stop recording: {str(e)}")
             return False
     
-    def _extract_audio_to_mp3(self) -> bool:
-        """Extract audio from video recording to a separate MP3 file."""
+    def _extract_audio(self) -> bool:
+        """Extract audio from video recording to a separate MP3 or M4A file."""
         try:
             if not self.current_recording_path or not self.current_recording_path.exists():
                 logger.warning("No recording file found to extract audio from")
                 return False
                 
-            logger.info(f"Extracting audio to MP3: {self.current_audio_path}")
+            logger.info(f"Extracting audio to {self.audio_format.upper()}: {self.current_audio_path}")
+            
+            if self.audio_format == "m4a":
+                # The recording's audio is already AAC, so copy the stream
+                # into an M4A container without decoding it
+                codec_args = ["-c:a", "copy"]
+            else:
+                # These settings are accepted by any FFmpeg build with
+                # libmp3lame, so a single attempt is enough
+                codec_args = [
+                    "-ar", "44100",  # Audio sample rate
+                    "-ac", "2",  # Stereo
+                    "-c:a", "libmp3lame",
+                    "-b:a", "192k",  # Bitrate
+                ]
             
-            # Command to extract audio to MP3
             command = [
                 "ffmpeg",
+                *FILE_INPUT_OPTIONS,
                 "-i", str(self.current_recording_path),
                 "-vn",  # No video
-                "-acodec", "libmp3lame",
-                "-q:a", "4",  # Quality setting (0-9, lower is better)
+                *codec_args,
                 "-y",  # Overwrite output file if it exists
                 str(self.current_audio_path)
             ]
@@ -473,57 +833,25 @@ class MeetingRecorder:
             # Run FFmpeg to extract audio
             process = subprocess.run(
                 command,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 text=True,
                 check=False,
                 creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
             )
             
-            if process.returncode == 0:
-                if self.current_audio_path.exists():
-                    file_size = self.current_audio_path.stat().st_size
-                    logger.info(f"Audio extracted to: {self.current_audio_path} (Size: {file_size / 1024:.2f} KB)")
-                    return True
-                else:
-                    logger.warning("Audio extraction completed but file not found")
-                    return False
-            else:
-                # More detailed error logging
+            if process.returncode != 0:
                 error_output = process.stderr.strip() if process.stderr else "Unknown error"
-                logger.warning(f"Audio extraction failed with code {process.returncode}: {error_output}")
-                
-                # Try a more compatible approach
-                logger.info("Trying alternative audio extraction method...")
-                alt_command = [
-                    "ffmpeg",
-                    "-i", str(self.current_recording_path),
-                    "-vn",  # No video
-                    "-ar", "44100",  # Audio sample rate
-                    "-ac", "2",  # Stereo
-                    "-b:a", "192k",  # Bitrate
-                    "-y",  # Overwrite output file if it exists
-                    str(self.current_audio_path)
-                ]
-                
-                logger.info(f"Running alternative extraction command: {alt_command}")
-                
-                alt_process = subprocess.run(
-                    alt_command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    check=False,
-                    creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
-                )
-                
-                if alt_process.returncode == 0 and self.current_audio_path.exists():
-                    file_size = self.current_audio_path.stat().st_size
-                    logger.info(f"Audio extracted with alternative method: {self.current_audio_path} (Size: {file_size / 1024:.2f} KB)")
-                    return True
-                else:
-                    logger.error(f"All audio extraction attempts failed. Last error: {alt_process.stderr}")
-                    return False
+                logger.error(f"Audio extraction failed with code {process.returncode}: {error_output}")
+                return False
+            
+            if not self.current_audio_path.exists():
+                logger.warning("Audio extraction completed but file not found")
+                return False
+            
+            file_size = self.current_audio_path.stat().st_size
+            logger.info(f"Audio extracted to: {self.current_audio_path} (Size: {file_size / 1024:.2f} KB)")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to extract audio: {str(e)}")
@@ -532,6 +860,43 @@ class MeetingRecorder:
     def get_recording_path(self) -> Optional[Path]:
         """Return the path of the current or last recording."""
         return self.current_recording_path
+    
+    def get_recording_size(self) -> Optional[int]:
+        """Return the current size of the recording file in bytes.
+        
+        The file is opened read-only the first time it is seen, and later
+        calls use fstat on that descriptor instead of looking up the path
+        again. Returns None if the file doesn't exist yet.
+        """
+        with self._recording_fd_lock:
+            if self._recording_fd is None:
+                if not self.current_recording_path:
+                    return None
+                
+                # Once FFmpeg is done, look the path up instead of opening a
+                # descriptor that stop_recording has already closed for good
+                process = self.recording_process
+                if self._stopping or process is None or process.poll() is not None:
+                    try:
+                        return os.path.getsize(self.current_recording_path)
+                    except OSError:
+                        return None
+                
+                try:
+                    self._recording_fd = os.open(str(self.current_recording_path), os.O_RDONLY)
+                except FileNotFoundError:
+                    return None
+            return os.fstat(self._recording_fd).st_size
+    
+    def _close_recording_fd(self):
+        """Close the descriptor opened by get_recording_size, if any."""
+        with self._recording_fd_lock:
+            if self._recording_fd is not None:
+                try:
+                    os.close(self._recording_fd)
+                except OSError:
+                    pass
+                self._recording_fd = None
         
     def get_audio_path(self) -> Optional[Path]:
         """Return the path of the extracted audio file."""
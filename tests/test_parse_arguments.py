@@ -0,0 +1,56 @@
+"""Check that the fast command-line parser agrees with argparse."""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import selenium  # noqa: F401  (google_meet_guest exits on import without it)
+except ImportError:
+    selenium = None
+else:
+    from google_meet_guest import _build_parser, _parse_arguments_fast
+
+
+@unittest.skipIf(selenium is None, "selenium is not installed")
+class ParseArgumentsTest(unittest.TestCase):
+    WELL_FORMED = [
+        ["abc-def-ghi", "Bob"],
+        ["abc-def-ghi", "Bob", "--debug", "--record"],
+        ["abc-def-ghi", "Bob", "--duration", "5"],
+        ["abc-def-ghi", "Bob", "--duration=-5"],
+        ["abc-def-ghi", "Bob", "--duration", "-5"],
+        ["--recording-dir", "out", "abc-def-ghi", "Bob"],
+        ["abc-def-ghi", "Bob", "--recording-dir=--debug"],
+        ["abc-def-ghi", "Bob", "--profile-dir=cache"],
+    ]
+    
+    MALFORMED = [
+        ["abc", "Bob", "--recording-dir", "--debug"],
+        ["abc", "Bob", "--duration", "--record"],
+        ["abc", "Bob", "--duration", "five"],
+        ["abc", "Bob", "--recording-dir"],
+        ["abc", "Bob", "--unknown"],
+        ["abc"],
+    ]
+    
+    def test_well_formed_matches_argparse(self):
+        for argv in self.WELL_FORMED:
+            with self.subTest(argv=argv):
+                fast = _parse_arguments_fast(argv)
+                self.assertIsNotNone(fast)
+                self.assertEqual(vars(fast), vars(_build_parser().parse_args(argv)))
+    
+    def test_malformed_falls_back_to_argparse(self):
+        for argv in self.MALFORMED:
+            with self.subTest(argv=argv):
+                self.assertIsNone(_parse_arguments_fast(argv))
+                with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                    _build_parser().parse_args(argv)
+
+
+if __name__ == "__main__":
+    unittest.main()